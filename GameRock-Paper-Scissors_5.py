@@ -11,6 +11,8 @@ from PIL import Image, ImageTk
 import io
 import base64
 
+from framing import LineFramer, FrameTooLarge, encode_json
+
 class ModernButton(tk.Button):
     """Custom modern button with hover effects"""
     def __init__(self, parent, text="", command=None, bg_color="#4a90e2", hover_color="#357abd", **kwargs):
@@ -57,6 +59,7 @@ class RPSGameGUI:
         self.server_port = 12345
         self.is_server = False
         self.socket = None
+        self.framer = None  # newline-delimited JSON reader for self.socket
         self.server_socket = None
         
         # Game data
@@ -67,8 +70,16 @@ class RPSGameGUI:
         self.opponent_move = None
         self.last_result = None
         
-        # GUI frames
+        # GUI frames: each screen is built once, stacked in one grid cell and raised
         self.current_frame = None
+        self.screens = {}
+        self.root.grid_rowconfigure(0, weight=1)
+        self.root.grid_columnconfigure(0, weight=1)
+        
+        # Bound variables for everything the screens update
+        self.status_var = tk.StringVar()
+        self.connect_target_var = tk.StringVar()
+        self.waiting_var = tk.StringVar()
         
         # Create main menu
         self.show_main_menu()
@@ -80,10 +91,17 @@ class RPSGameGUI:
         y = (self.root.winfo_screenheight() // 2) - (600 // 2)
         self.root.geometry(f"800x600+{x}+{y}")
     
-    def clear_frame(self):
-        """Clear current frame"""
-        if self.current_frame:
-            self.current_frame.destroy()
+    def show_screen(self, name):
+        """Raise a cached screen, building it on first use"""
+        frame = self.screens.get(name)
+        if frame is None:
+            frame = tk.Frame(self.root, bg="#1a1a2e")
+            frame.grid(row=0, column=0, sticky="nsew")
+            getattr(self, f"build_{name}_screen")(frame)
+            self.screens[name] = frame
+        frame.tkraise()
+        self.current_frame = frame
+        return frame
     
     def create_title_label(self, parent, text, size=24):
         """Create styled title label"""
@@ -141,14 +159,14 @@ class RPSGameGUI:
     
     def show_main_menu(self):
         """Display main menu"""
-        self.clear_frame()
         self.game_state = "menu"
-        
-        self.current_frame = tk.Frame(self.root, bg="#1a1a2e")
-        self.current_frame.pack(expand=True, fill="both")
+        self.status_var.set("")
+        self.show_screen("menu")
+    
+    def build_menu_screen(self, frame):
         
         # Title section
-        title_frame = tk.Frame(self.current_frame, bg="#1a1a2e")
+        title_frame = tk.Frame(frame, bg="#1a1a2e")
         title_frame.pack(pady=(50, 30))
         
         # Game title
@@ -159,7 +177,7 @@ class RPSGameGUI:
         subtitle.pack(pady=(5, 0))
         
         # Input section
-        input_frame = tk.Frame(self.current_frame, bg="#1a1a2e")
+        input_frame = tk.Frame(frame, bg="#1a1a2e")
         input_frame.pack(pady=20)
         
         # Player name input
@@ -187,7 +205,7 @@ class RPSGameGUI:
         self.port_entry.pack(side="left")
         
         # Buttons section
-        button_frame = tk.Frame(self.current_frame, bg="#1a1a2e")
+        button_frame = tk.Frame(frame, bg="#1a1a2e")
         button_frame.pack(pady=40)
         
         # Server button
@@ -211,7 +229,8 @@ class RPSGameGUI:
         client_btn.pack(pady=5, ipadx=20)
         
         # Status label
-        self.status_label = self.create_subtitle_label(self.current_frame, "", 10)
+        self.status_label = self.create_subtitle_label(frame, "", 10)
+        self.status_label.config(textvariable=self.status_var)
         self.status_label.pack(pady=(20, 0))
     
     def get_entry_value(self, entry, placeholder):
@@ -274,16 +293,16 @@ class RPSGameGUI:
         try:
             client_socket, address = self.server_socket.accept()
             self.socket = client_socket
+            self.framer = LineFramer(client_socket)
             
             # Receive opponent name
-            data = self.socket.recv(1024).decode('utf-8')
-            msg = json.loads(data)
-            if msg['type'] == 'join':
+            msg = self.recv_message()
+            if msg and msg['type'] == 'join':
                 self.opponent_name = msg['data']['name']
                 
                 # Send acknowledgment
                 response = {"type": "game_start", "data": {"opponent": self.player_name}}
-                self.socket.send(json.dumps(response).encode('utf-8'))
+                self.send_message(response)
                 
                 # Start game
                 self.root.after(0, self.show_game_screen)
@@ -300,15 +319,15 @@ class RPSGameGUI:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.server_host, self.server_port))
+            self.framer = LineFramer(self.socket)
             
             # Send join message
             join_msg = {"type": "join", "data": {"name": self.player_name}}
-            self.socket.send(json.dumps(join_msg).encode('utf-8'))
+            self.send_message(join_msg)
             
             # Wait for game start
-            data = self.socket.recv(1024).decode('utf-8')
-            msg = json.loads(data)
-            if msg['type'] == 'game_start':
+            msg = self.recv_message()
+            if msg and msg['type'] == 'game_start':
                 self.opponent_name = msg['data']['opponent']
                 self.root.after(0, self.show_game_screen)
                 
@@ -320,15 +339,28 @@ class RPSGameGUI:
             self.root.after(0, lambda: messagebox.showerror("Connection Error", f"Could not connect: {e}"))
             self.root.after(0, self.show_main_menu)
     
+    def send_message(self, msg):
+        """Send one newline-terminated JSON message to the peer"""
+        self.socket.sendall(encode_json(msg))
+    
+    def recv_message(self):
+        """Next complete message from the peer, or None once the link closes"""
+        try:
+            frame = self.framer.read_frame()
+        except (FrameTooLarge, OSError):
+            return None
+        if frame is None:
+            return None
+        return json.loads(frame)
+    
     def handle_messages(self):
        
         while True:
             try:
-                data = self.socket.recv(1024).decode('utf-8')
-                if not data:
+                msg = self.recv_message()
+                if msg is None:
                     break
                 
-                msg = json.loads(data)
                 if msg['type'] == 'move':
                     self.opponent_move = msg['data']['move']
                     self.root.after(0, self.process_round)
@@ -341,57 +373,59 @@ class RPSGameGUI:
     
     def show_connecting_screen(self):
         
-        self.clear_frame()
         self.game_state = "connecting"
+        self.connect_target_var.set(f"Connecting to {self.server_host}:{self.server_port}")
+        self.show_screen("connecting")
         
-        self.current_frame = tk.Frame(self.root, bg="#1a1a2e")
-        self.current_frame.pack(expand=True, fill="both")
+        # Animate dots
+        self.animate_dots(self.connecting_title, "🔗 CONNECTING")
+    
+    def build_connecting_screen(self, frame):
         
         # Connecting animation
-        title = self.create_title_label(self.current_frame, "🔗 CONNECTING...", 24)
-        title.pack(pady=(150, 20))
+        self.connecting_title = self.create_title_label(frame, "🔗 CONNECTING...", 24)
+        self.connecting_title.pack(pady=(150, 20))
         
-        subtitle = self.create_subtitle_label(self.current_frame, f"Connecting to {self.server_host}:{self.server_port}", 12)
+        subtitle = self.create_subtitle_label(frame, "", 12)
+        subtitle.config(textvariable=self.connect_target_var)
         subtitle.pack()
         
         # Cancel button
         cancel_btn = ModernButton(
-            self.current_frame,
+            frame,
             text="Cancel",
             command=self.show_main_menu,
             bg_color="#e74c3c",
             hover_color="#c0392b"
         )
         cancel_btn.pack(pady=30)
-        
-        # Animate dots
-        self.animate_dots(title, "🔗 CONNECTING")
     
     def show_waiting_screen(self, message):
         
-        self.clear_frame()
         self.game_state = "waiting"
+        self.waiting_var.set(message)
+        self.show_screen("waiting")
         
-        self.current_frame = tk.Frame(self.root, bg="#1a1a2e")
-        self.current_frame.pack(expand=True, fill="both")
+        # Animate dots
+        self.animate_dots(self.waiting_title, "⏳ WAITING")
+    
+    def build_waiting_screen(self, frame):
         
-        title = self.create_title_label(self.current_frame, "⏳ WAITING...", 24)
-        title.pack(pady=(150, 20))
+        self.waiting_title = self.create_title_label(frame, "⏳ WAITING...", 24)
+        self.waiting_title.pack(pady=(150, 20))
         
-        subtitle = self.create_subtitle_label(self.current_frame, message, 12)
+        subtitle = self.create_subtitle_label(frame, "", 12)
+        subtitle.config(textvariable=self.waiting_var)
         subtitle.pack()
         
         # Cancel button
         cancel_btn = ModernButton(
-            self.current_frame,
+            frame,
             text="Cancel",
             command=self.show_main_menu,
             bg_color="#e74c3c",
             hover_color="#c0392b"
         )
         cancel_btn.pack(pady=30)
-        
-        # Animate dots
-        self.animate_dots(title, "⏳ WAITING")
     
     
\ No newline at end of file
@@ -11,6 +11,10 @@ from PIL import Image, ImageTk
 import io
 import base64
 
+from outcomes import determine
+from framing import LineFramer, FrameTooLarge, encode_json
+from resultpanel import ResultPanel
+
 class ModernButton(tk.Button):
     """Custom modern button with hover effects"""
     def __init__(self, parent, text="", command=None, bg_color="#4a90e2", hover_color="#357abd", **kwargs):
@@ -57,6 +61,7 @@ class RPSGameGUI:
         self.server_port = 12345
         self.is_server = False
         self.socket = None
+        self.framer = None  # newline-delimited JSON reader for self.socket
         self.server_socket = None
         
         # Game data
@@ -67,8 +72,26 @@ class RPSGameGUI:
         self.opponent_move = None
         self.last_result = None
         
-        # GUI frames
+        # GUI frames: each screen is built once, stacked in one grid cell and raised
         self.current_frame = None
+        self.screens = {}
+        self.root.grid_rowconfigure(0, weight=1)
+        self.root.grid_columnconfigure(0, weight=1)
+        self.dots_job = None
+        
+        # Bound variables for everything the screens update
+        self.status_var = tk.StringVar()
+        self.connect_target_var = tk.StringVar()
+        self.waiting_var = tk.StringVar()
+        self.player_name_var = tk.StringVar()
+        self.opponent_name_var = tk.StringVar()
+        self.player_score_var = tk.StringVar()
+        self.opponent_score_var = tk.StringVar()
+        self.game_message_var = tk.StringVar()
+        
+        # Round results share one overlay; turbo skips its animation
+        self.turbo = tk.BooleanVar(value=False)
+        self.result_panel = ResultPanel(self.root)
         
         # Create main menu
         self.show_main_menu()
@@ -80,10 +103,18 @@ class RPSGameGUI:
         y = (self.root.winfo_screenheight() // 2) - (600 // 2)
         self.root.geometry(f"800x600+{x}+{y}")
     
-    def clear_frame(self):
-        """Clear current frame"""
-        if self.current_frame:
-            self.current_frame.destroy()
+    def show_screen(self, name):
+        """Raise a cached screen, building it on first use"""
+        self.result_panel.hide()
+        frame = self.screens.get(name)
+        if frame is None:
+            frame = tk.Frame(self.root, bg="#1a1a2e")
+            frame.grid(row=0, column=0, sticky="nsew")
+            getattr(self, f"build_{name}_screen")(frame)
+            self.screens[name] = frame
+        frame.tkraise()
+        self.current_frame = frame
+        return frame
     
     def create_title_label(self, parent, text, size=24):
         """Create styled title label"""
@@ -141,14 +172,14 @@ class RPSGameGUI:
     
     def show_main_menu(self):
         """Display main menu"""
-        self.clear_frame()
         self.game_state = "menu"
-        
-        self.current_frame = tk.Frame(self.root, bg="#1a1a2e")
-        self.current_frame.pack(expand=True, fill="both")
+        self.status_var.set("")
+        self.show_screen("menu")
+    
+    def build_menu_screen(self, frame):
         
         # Title section
-        title_frame = tk.Frame(self.current_frame, bg="#1a1a2e")
+        title_frame = tk.Frame(frame, bg="#1a1a2e")
         title_frame.pack(pady=(50, 30))
         
         # Game title
@@ -159,7 +190,7 @@ class RPSGameGUI:
         subtitle.pack(pady=(5, 0))
         
         # Input section
-        input_frame = tk.Frame(self.current_frame, bg="#1a1a2e")
+        input_frame = tk.Frame(frame, bg="#1a1a2e")
         input_frame.pack(pady=20)
         
         # Player name input
@@ -187,7 +218,7 @@ class RPSGameGUI:
         self.port_entry.pack(side="left")
         
         # Buttons section
-        button_frame = tk.Frame(self.current_frame, bg="#1a1a2e")
+        button_frame = tk.Frame(frame, bg="#1a1a2e")
         button_frame.pack(pady=40)
         
         # Server button
@@ -211,7 +242,8 @@ class RPSGameGUI:
         client_btn.pack(pady=5, ipadx=20)
         
         # Status label
-        self.status_label = self.create_subtitle_label(self.current_frame, "", 10)
+        self.status_label = self.create_subtitle_label(frame, "", 10)
+        self.status_label.config(textvariable=self.status_var)
         self.status_label.pack(pady=(20, 0))
     
     def get_entry_value(self, entry, placeholder):
@@ -274,16 +306,16 @@ class RPSGameGUI:
         try:
             client_socket, address = self.server_socket.accept()
             self.socket = client_socket
+            self.framer = LineFramer(client_socket)
             
             # Receive opponent name
-            data = self.socket.recv(1024).decode('utf-8')
-            msg = json.loads(data)
-            if msg['type'] == 'join':
+            msg = self.recv_message()
+            if msg and msg['type'] == 'join':
                 self.opponent_name = msg['data']['name']
                 
                 # Send acknowledgment
                 response = {"type": "game_start", "data": {"opponent": self.player_name}}
-                self.socket.send(json.dumps(response).encode('utf-8'))
+                self.send_message(response)
                 
                 # Start game
                 self.root.after(0, self.show_game_screen)
@@ -300,15 +332,15 @@ class RPSGameGUI:
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.connect((self.server_host, self.server_port))
+            self.framer = LineFramer(self.socket)
             
             # Send join message
             join_msg = {"type": "join", "data": {"name": self.player_name}}
-            self.socket.send(json.dumps(join_msg).encode('utf-8'))
+            self.send_message(join_msg)
             
             # Wait for game start
-            data = self.socket.recv(1024).decode('utf-8')
-            msg = json.loads(data)
-            if msg['type'] == 'game_start':
+            msg = self.recv_message()
+            if msg and msg['type'] == 'game_start':
                 self.opponent_name = msg['data']['opponent']
                 self.root.after(0, self.show_game_screen)
                 
@@ -320,15 +352,28 @@ class RPSGameGUI:
             self.root.after(0, lambda: messagebox.showerror("Connection Error", f"Could not connect: {e}"))
             self.root.after(0, self.show_main_menu)
     
+    def send_message(self, msg):
+        """Send one newline-terminated JSON message to the peer"""
+        self.socket.sendall(encode_json(msg))
+    
+    def recv_message(self):
+        """Next complete message from the peer, or None once the link closes"""
+        try:
+            frame = self.framer.read_frame()
+        except (FrameTooLarge, OSError):
+            return None
+        if frame is None:
+            return None
+        return json.loads(frame)
+    
     def handle_messages(self):
        
         while True:
             try:
-                data = self.socket.recv(1024).decode('utf-8')
-                if not data:
+                msg = self.recv_message()
+                if msg is None:
                     break
                 
-                msg = json.loads(data)
                 if msg['type'] == 'move':
                     self.opponent_move = msg['data']['move']
                     self.root.after(0, self.process_round)
@@ -341,78 +386,88 @@ class RPSGameGUI:
     
     def show_connecting_screen(self):
         
-        self.clear_frame()
         self.game_state = "connecting"
+        self.connect_target_var.set(f"Connecting to {self.server_host}:{self.server_port}")
+        self.show_screen("connecting")
         
-        self.current_frame = tk.Frame(self.root, bg="#1a1a2e")
-        self.current_frame.pack(expand=True, fill="both")
+        # Animate dots
+        self.animate_dots(self.connecting_title, "🔗 CONNECTING")
+    
+    def build_connecting_screen(self, frame):
         
         # Connecting animation
-        title = self.create_title_label(self.current_frame, "🔗 CONNECTING...", 24)
-        title.pack(pady=(150, 20))
+        self.connecting_title = self.create_title_label(frame, "🔗 CONNECTING...", 24)
+        self.connecting_title.pack(pady=(150, 20))
         
-        subtitle = self.create_subtitle_label(self.current_frame, f"Connecting to {self.server_host}:{self.server_port}", 12)
+        subtitle = self.create_subtitle_label(frame, "", 12)
+        subtitle.config(textvariable=self.connect_target_var)
         subtitle.pack()
         
         # Cancel button
         cancel_btn = ModernButton(
-            self.current_frame,
+            frame,
             text="Cancel",
             command=self.show_main_menu,
             bg_color="#e74c3c",
             hover_color="#c0392b"
         )
         cancel_btn.pack(pady=30)
-        
-        # Animate dots
-        self.animate_dots(title, "🔗 CONNECTING")
     
     def show_waiting_screen(self, message):
         
-        self.clear_frame()
         self.game_state = "waiting"
+        self.waiting_var.set(message)
+        self.show_screen("waiting")
         
-        self.current_frame = tk.Frame(self.root, bg="#1a1a2e")
-        self.current_frame.pack(expand=True, fill="both")
+        # Animate dots
+        self.animate_dots(self.waiting_title, "⏳ WAITING")
+    
+    def build_waiting_screen(self, frame):
         
-        title = self.create_title_label(self.current_frame, "⏳ WAITING...", 24)
-        title.pack(pady=(150, 20))
+        self.waiting_title = self.create_title_label(frame, "⏳ WAITING...", 24)
+        self.waiting_title.pack(pady=(150, 20))
         
-        subtitle = self.create_subtitle_label(self.current_frame, message, 12)
+        subtitle = self.create_subtitle_label(frame, "", 12)
+        subtitle.config(textvariable=self.waiting_var)
         subtitle.pack()
         
         # Cancel button
         cancel_btn = ModernButton(
-            self.current_frame,
+            frame,
             text="Cancel",
             command=self.show_main_menu,
             bg_color="#e74c3c",
             hover_color="#c0392b"
         )
         cancel_btn.pack(pady=30)
-        
-        # Animate dots
-        self.animate_dots(title, "⏳ WAITING")
     
     def animate_dots(self, label, base_text):
         
+        # One animation at a time, now that screens outlive their visits
+        if self.dots_job:
+            self.root.after_cancel(self.dots_job)
+            self.dots_job = None
         if self.game_state in ["connecting", "waiting"]:
             dots = ["", ".", "..", "..."]
             current_dots = getattr(self, 'dot_count', 0)
             label.config(text=base_text + dots[current_dots])
             self.dot_count = (current_dots + 1) % 4
-            self.root.after(500, lambda: self.animate_dots(label, base_text))
+            self.dots_job = self.root.after(500, lambda: self.animate_dots(label, base_text))
     
     def show_game_screen(self):
         
-        self.clear_frame()
         self.game_state = "playing"
-        
-        self.current_frame = tk.Frame(self.root, bg="#1a1a2e")
-        self.current_frame.pack(expand=True, fill="both")
+        self.player_name_var.set(self.player_name)
+        self.opponent_name_var.set(self.opponent_name)
+        self.player_score_var.set(f"Score: {self.player_score}")
+        self.opponent_score_var.set(f"Score: {self.opponent_score}")
+        self.game_message_var.set("Choose your move!")
+        self.show_screen("game")
+    
+    def build_game_screen(self, frame):
         
         # Header with scores
-        header_frame = tk.Frame(self.current_frame, bg="#2d2d44", height=80)
+        header_frame = tk.Frame(frame, bg="#2d2d44", height=80)
         header_frame.pack(fill="x", padx=20, pady=(20, 10))
         header_frame.pack_propagate(False)
         
@@ -420,10 +475,10 @@ class RPSGameGUI:
         player_frame = tk.Frame(header_frame, bg="#2d2d44")
         player_frame.pack(side="left", fill="y", padx=20, pady=10)
         
-        player_name_label = tk.Label(player_frame, text=self.player_name, font=("Arial", 14, "bold"), fg="#ffffff", bg="#2d2d44")
+        player_name_label = tk.Label(player_frame, textvariable=self.player_name_var, font=("Arial", 14, "bold"), fg="#ffffff", bg="#2d2d44")
         player_name_label.pack()
         
-        player_score_label = tk.Label(player_frame, text=f"Score: {self.player_score}", font=("Arial", 12), fg="#27ae60", bg="#2d2d44")
+        player_score_label = tk.Label(player_frame, textvariable=self.player_score_var, font=("Arial", 12), fg="#27ae60", bg="#2d2d44")
         player_score_label.pack()
         
         # VS label
@@ -434,18 +489,19 @@ class RPSGameGUI:
         opponent_frame = tk.Frame(header_frame, bg="#2d2d44")
         opponent_frame.pack(side="right", fill="y", padx=20, pady=10)
         
-        opponent_name_label = tk.Label(opponent_frame, text=self.opponent_name, font=("Arial", 14, "bold"), fg="#ffffff", bg="#2d2d44")
+        opponent_name_label = tk.Label(opponent_frame, textvariable=self.opponent_name_var, font=("Arial", 14, "bold"), fg="#ffffff", bg="#2d2d44")
         opponent_name_label.pack()
         
-        opponent_score_label = tk.Label(opponent_frame, text=f"Score: {self.opponent_score}", font=("Arial", 12), fg="#e74c3c", bg="#2d2d44")
+        opponent_score_label = tk.Label(opponent_frame, textvariable=self.opponent_score_var, font=("Arial", 12), fg="#e74c3c", bg="#2d2d44")
         opponent_score_label.pack()
         
         # Game area
-        game_frame = tk.Frame(self.current_frame, bg="#1a1a2e")
+        game_frame = tk.Frame(frame, bg="#1a1a2e")
         game_frame.pack(expand=True, fill="both", padx=20, pady=20)
         
         # Game message
-        self.game_message = self.create_title_label(game_frame, "Choose your move!", 18)
+        self.game_message = self.create_title_label(game_frame, "", 18)
+        self.game_message.config(textvariable=self.game_message_var)
         self.game_message.pack(pady=(20, 40))
         
         # Move buttons
@@ -484,7 +540,7 @@ class RPSGameGUI:
         
         # Quit button
         quit_btn = ModernButton(
-            self.current_frame,
+            frame,
             text="Quit Game",
             command=self.quit_game,
             bg_color="#34495e",
@@ -492,26 +548,58 @@ class RPSGameGUI:
         )
         quit_btn.pack(pady=10)
         
+        # Turbo toggle
+        turbo_check = tk.Checkbutton(
+            frame,
+            text="Turbo (no result animation)",
+            variable=self.turbo,
+            command=lambda: self.result_panel.set_turbo(self.turbo.get()),
+            fg="#a0a0a0",
+            bg="#1a1a2e",
+            selectcolor="#2d2d44",
+            activebackground="#1a1a2e"
+        )
+        turbo_check.pack()
+        
         # Store references for updates
         self.player_score_label = player_score_label
         self.opponent_score_label = opponent_score_label
     
     def make_move(self, move):
     
-        if self.game_state != "playing":
-            return
+        if self.game_state != "playing" or self.player_move:
+            return  # one move per round
         
         self.player_move = move
-        self.game_message.config(text=f"You chose {move.upper()}! Waiting for opponent...")
+        self.game_message_var.set(f"You chose {move.upper()}! Waiting for opponent...")
         
         # Send move to opponent
         if self.socket:
             move_msg = {"type": "move", "data": {"move": move}}
             try:
-                self.socket.send(json.dumps(move_msg).encode('utf-8'))
+                self.send_message(move_msg)
             except:
                 messagebox.showerror("Connection Error", "Lost connection to opponent!")
                 self.show_main_menu()
+                return
+        
+        # The opponent may have moved first
+        self.process_round()
+    
+    def quit_game(self):
+        """Leave the game and go back to the main menu"""
+        if self.socket:
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+            self.socket = None
+            self.framer = None
+        self.player_score = 0
+        self.opponent_score = 0
+        self.player_move = None
+        self.opponent_move = None
+        self.show_main_menu()
     
     def process_round(self):
         
@@ -531,36 +619,22 @@ class RPSGameGUI:
         self.show_result_screen(result)
         
         # Update score labels
-        if hasattr(self, 'player_score_label'):
-            self.player_score_label.config(text=f"Score: {self.player_score}")
-            self.opponent_score_label.config(text=f"Score: {self.opponent_score}")
+        self.player_score_var.set(f"Score: {self.player_score}")
+        self.opponent_score_var.set(f"Score: {self.opponent_score}")
+        
+        # Start the next round with both moves cleared
+        self.player_move = None
+        self.opponent_move = None
+        self.game_message_var.set("Choose your move!")
     
     def determine_winner(self, player_move, opponent_move):
-       
-        if player_move == opponent_move:
-            return "tie"
-        
-        win_conditions = {
-            "rock": "scissors",
-            "paper": "rock", 
-            "scissors": "paper"
-        }
-        
-        return "win" if win_conditions[player_move] == opponent_move else "lose"
+        """Look the result up in the shared precomputed outcome table"""
+        return determine(player_move, opponent_move)
     
     def show_result_screen(self, result):
-        
-        # Create result popup
-        result_window = tk.Toplevel(self.root)
-        result_window.title("Round Result")
-        result_window.geometry("400x300")
-        result_window.configure(bg="#1a1a2e")
-        result_window.resizable(False, False)
-        
-        # Center the popup
-        result_window.transient(self.root)
-        result_window.grab_set()
-        
-        x = self.root.winfo_x() + 200
-        y = self.root.winfo_y() + 150
-        result_window.geometry(f"400x300+{x}+{y}")
\ No newline at end of file
+        """Update the result overlay in place instead of opening a popup"""
+        self.result_panel.show(
+            result,
+            f"You: {self.player_move.upper()}\nOpponent: {self.opponent_move.upper()}",
+            f"{self.player_name} {self.player_score} - {self.opponent_score} {self.opponent_name}"
+        )
\ No newline at end of file
@@ -0,0 +1,177 @@
+import asyncio, signal, time
+
+from framing import CHUNK_SIZE, FrameTooLarge
+from gameserver import (HOST, PORT, BACKLOG, WRITE_TIMEOUT, RESUME_GRACE, PlayerConn, RpsServer,
+                        CONNECTIONS, OPEN_CONNECTIONS, SEND_LATENCY)
+from outbox import OUTBOX_SIZE, DISCONNECT
+from profiling import PROFILER
+from heartbeat import IDLE_TIMEOUT
+from ratelimit import MESSAGE_RATE, IP_RATE
+
+# Single event-loop engine for the same join/move/quit protocol. Idle
+# connections cost one coroutine and a transport instead of an OS thread,
+# so one process can hold tens of thousands of them.
+
+SHUTDOWN_GRACE = 2.0  # seconds connection handlers get to finish after Ctrl+C / SIGTERM
+
+# Connection wrapper ------------------------------------------------
+class AsyncPlayerConn(PlayerConn):
+    def __init__(self, reader, writer, outbox_size=OUTBOX_SIZE, policy=DISCONNECT):
+        super().__init__(writer, writer.get_extra_info("peername"), outbox_size, policy)
+        self.reader = reader
+        self.ready = asyncio.Event()
+        self.outbox.wakeup = self.ready.set
+
+    def start_writer(self):
+        self.writer = asyncio.get_running_loop().create_task(self.writer_loop())
+
+    async def writer_loop(self):
+        # The outbox only backs up while drain() waits on a slow peer
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                batch = self.outbox.drain()
+                if batch:
+                    t0 = time.perf_counter()
+                    self.conn.write(b"".join(batch))
+                    await asyncio.wait_for(self.conn.drain(), WRITE_TIMEOUT)
+                    SEND_LATENCY.observe(time.perf_counter() - t0)
+                if self.outbox.closed and not self.outbox.items:
+                    break
+        except (ConnectionError, asyncio.TimeoutError):
+            self.abort()
+        finally:
+            self.conn.close()
+
+    def close(self):
+        self.outbox.close()
+
+    def abort(self):
+        self.outbox.close()
+        self.conn.transport.abort()
+
+    async def recv(self):
+        framer, guard = self.framer, self.guard
+        try:
+            while True:
+                while not framer.pending:
+                    data = await self.reader.read(CHUNK_SIZE)
+                    if not data:
+                        return None
+                    framer.feed(data)
+                line = framer.pop()
+                if guard is None or guard.allow():  # refused frames are dropped undecoded
+                    break
+        except (FrameTooLarge, ConnectionError):
+            return None
+        try:
+            return self.codec.decode(line)
+        except ValueError:
+            return None
+
+# Core server -------------------------------------------------------
+class AsyncRpsServer(RpsServer):
+    def __init__(self, host=HOST, port=PORT, outbox_size=OUTBOX_SIZE, slow_policy=DISCONNECT,
+                 move_timeout=None, reuse_port=False, control_path=None, metrics_port=None,
+                 history_path=None, record_path=None, resume_grace=RESUME_GRACE, idle_timeout=IDLE_TIMEOUT,
+                 rate_limit=MESSAGE_RATE, ip_rate_limit=IP_RATE):
+        super().__init__(host, port, outbox_size, slow_policy, move_timeout, reuse_port, control_path,
+                         metrics_port, history_path, record_path, resume_grace, idle_timeout,
+                         rate_limit, ip_rate_limit)
+        self.loop = None
+        self.stopping = None
+        self.conns = {}  # AsyncPlayerConn -> the task handling it
+
+    def start(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            print("\n[SERVER] Shutting down...")
+        finally:
+            self.shutdown()
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(sig, self.stopping.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass  # Windows, or not the main thread; KeyboardInterrupt still stops start()
+        self.sock = await asyncio.start_server(self.handle_client, self.host, self.port,
+                                               backlog=BACKLOG, reuse_address=True,
+                                               reuse_port=self.reuse_port or None)
+        print(f"[SERVER] Listening on {self.host}:{self.port}")
+        self.start_control()
+        self.start_metrics()
+        self.sweep_lobby()
+        self.reap_idle()
+        await self.stopping.wait()
+        print("\n[SERVER] Shutting down...")
+        await self.close_clients()
+
+    async def close_clients(self):
+        """Stop accepting, then let each handler run its normal disconnect."""
+        self.running = False  # nobody is held for resume from here on
+        self.sock.close()
+        for player in list(self.conns):
+            player.close()
+        pending = list(self.conns.values())
+        if pending:
+            _, pending = await asyncio.wait(pending, timeout=SHUTDOWN_GRACE)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def handle_client(self, reader, writer):
+        player = AsyncPlayerConn(reader, writer, self.outbox_size, self.slow_policy)
+        print(f"[SERVER] Connection from {player.addr}")
+        CONNECTIONS.inc()
+        OPEN_CONNECTIONS.inc()
+        self.conns[player] = asyncio.current_task()
+        try:
+            admitted = False
+            try:
+                self.track(player)
+                player.start_writer()
+                # First message must be join
+                first = await player.recv()
+                admitted = PROFILER.call("join", self.admit, player, first)
+            except Exception as e:
+                print(f"[SERVER] Bad join from {player.addr}: {e}")
+            finally:
+                if not admitted:
+                    self.reject(player)
+            if not admitted:
+                return
+            reason = "eof"
+            try:
+                while self.running and player.active:
+                    msg = await player.recv()
+                    if msg is None:
+                        break
+                    if not self.handle_message(player, msg):
+                        reason = "quit"
+                        break
+            except asyncio.CancelledError:
+                reason = "shutdown"
+            except Exception as e:
+                reason = "error"
+                print(f"[SERVER] Error with {player.name}: {e}")
+            finally:
+                self.disconnect(player, reason)
+        except asyncio.CancelledError:
+            pass  # cancelled while joining; reject() has closed it
+        finally:
+            del self.conns[player]
+            OPEN_CONNECTIONS.dec()
+
+    def schedule(self, delay, fn):
+        # The event loop's own heap scheduler; its handles support cancel() too
+        return self.loop.call_later(delay, fn)
+
+if __name__ == "__main__":
+    print("Rock-Paper-Scissors Server (asyncio)")
+    print(f"Listening on {HOST}:{PORT}")
+    AsyncRpsServer().start()
@@ -0,0 +1,76 @@
+import socket, subprocess, sys, time, argparse, os
+
+from gameserver import raise_nofile_limit
+
+# Idle-connection benchmark: start the server with each engine, park N
+# connected-but-silent sockets on it and report what that costs the server.
+
+def proc_status(pid):
+    stats = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "Threads"):
+                stats[key] = int(value.split()[0])
+    return stats
+
+def wait_for_port(host, port, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+def run_engine(engine, connections, port, settle):
+    server = subprocess.Popen(
+        [sys.executable, "gameserver.py", "--engine", engine, "--host", "127.0.0.1", "--port", str(port)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    socks = []
+    try:
+        if not wait_for_port("127.0.0.1", port):
+            raise RuntimeError(f"{engine} server did not start")
+        base = proc_status(server.pid)
+        t0 = time.perf_counter()
+        for _ in range(connections):
+            socks.append(socket.create_connection(("127.0.0.1", port)))
+        connect_time = time.perf_counter() - t0
+        time.sleep(settle)
+        alive = server.poll() is None
+        loaded = proc_status(server.pid) if alive else {"VmRSS": 0, "Threads": 0}
+        return {
+            "engine": engine,
+            "connections": len(socks),
+            "alive": alive,
+            "connect_s": connect_time,
+            "rss_mb": loaded["VmRSS"] / 1024,
+            "rss_per_conn_kb": (loaded["VmRSS"] - base["VmRSS"]) / max(len(socks), 1),
+            "threads": loaded["Threads"],
+        }
+    finally:
+        for s in socks:
+            s.close()
+        server.terminate()
+        server.wait()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare idle-connection cost of the server engines")
+    parser.add_argument("-n", "--connections", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=23456)
+    parser.add_argument("--settle", type=float, default=1.0, help="seconds to wait before sampling")
+    parser.add_argument("--engines", default="threads,asyncio")
+    args = parser.parse_args(argv)
+    raise_nofile_limit()
+
+    print(f"{'engine':<8} {'conns':>6} {'connect s':>10} {'RSS MB':>8} {'KB/conn':>8} {'threads':>8}")
+    for i, engine in enumerate(args.engines.split(",")):
+        r = run_engine(engine, args.connections, args.port + i, args.settle)
+        note = "" if r["alive"] else "  (server died)"
+        print(f"{r['engine']:<8} {r['connections']:>6} {r['connect_s']:>10.3f} {r['rss_mb']:>8.1f} "
+              f"{r['rss_per_conn_kb']:>8.1f} {r['threads']:>8}{note}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import json, time, argparse
+
+from framing import LineFramer
+
+# Microbenchmark: byte-at-a-time recv_json_line versus LineFramer. The
+# stream is served from memory by a counting socket so the numbers show
+# recv() calls (one syscall each on a real socket) and parse CPU only.
+
+class CountingSocket:
+    def __init__(self, data):
+        self.view = memoryview(data)
+        self.pos = 0
+        self.calls = 0
+
+    def recv(self, n):
+        self.calls += 1
+        chunk = self.view[self.pos:self.pos + n].tobytes()
+        self.pos += len(chunk)
+        return chunk
+
+    def recv_into(self, buf):
+        self.calls += 1
+        n = min(len(buf), len(self.view) - self.pos)
+        buf[:n] = self.view[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+def legacy_recv_json_line(conn):
+    # The pre-framer implementation, kept here for comparison
+    buff = b""
+    while True:
+        chunk = conn.recv(1)
+        if not chunk:
+            return None
+        if chunk == b"\n":
+            break
+        buff += chunk
+    try:
+        return json.loads(buff.decode("utf-8"))
+    except Exception:
+        return None
+
+def make_stream(messages):
+    packet = {"type": "round_result", "data": {
+        "round": 1, "winner": "alice",
+        "p1": {"name": "alice", "move": "rock", "score": 3},
+        "p2": {"name": "bob", "move": "scissors", "score": 1},
+        "outcome_p1": "win", "outcome_p2": "lose"}}
+    line = json.dumps(packet, separators=(",", ":")).encode("utf-8") + b"\n"
+    return line * messages, len(line)
+
+def run_legacy(data, messages):
+    sock = CountingSocket(data)
+    t0 = time.process_time()
+    for _ in range(messages):
+        legacy_recv_json_line(sock)
+    return sock.calls, time.process_time() - t0
+
+def run_framer(data, messages):
+    sock = CountingSocket(data)
+    framer = LineFramer(sock)
+    t0 = time.process_time()
+    for _ in range(messages):
+        json.loads(framer.read_frame())
+    return sock.calls, time.process_time() - t0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="recv_json_line framing microbenchmark")
+    parser.add_argument("-n", "--messages", type=int, default=20000)
+    args = parser.parse_args(argv)
+    data, size = make_stream(args.messages)
+    print(f"{args.messages} messages of {size} bytes")
+    print(f"{'reader':<10} {'recv calls':>11} {'calls/msg':>10} {'CPU us/msg':>11}")
+    for name, fn in (("byte-loop", run_legacy), ("framer", run_framer)):
+        calls, cpu = fn(data, args.messages)
+        print(f"{name:<10} {calls:>11} {calls / args.messages:>10.3f} {cpu / args.messages * 1e6:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import argparse, contextlib, io, json, platform, subprocess, sys, time
+
+from bench_framing import CountingSocket, make_stream
+from framing import LineFramer
+from gameserver import PlayerConn, RpsServer, recv_json_line
+from matches import Match, RoomRegistry
+from codec import CODECS
+from outcomes import MOVES
+
+# Hot-path benchmark suite -----------------------------------------------------
+# python bench_suite.py --output new.json --compare baseline.json
+# Each benchmark reports the best ns/op over several repeats. With
+# --compare, any benchmark slower than baseline * (1 + threshold) fails the run.
+
+THRESHOLD = 0.15
+FANOUT = 100
+SPECTATORS = 500
+
+class NullSocket:
+    def sendall(self, data):
+        pass
+
+    def recv_into(self, buf):
+        return 0
+
+    def shutdown(self, how):
+        pass
+
+    def close(self):
+        pass
+
+def make_player(name):
+    player = PlayerConn(NullSocket(), ("127.0.0.1", 0), outbox_size=1 << 20)
+    player.name = name
+    return player
+
+def flush(players):
+    # Stand-in for the writer: hand each queued batch to the socket
+    for p in players:
+        batch = p.outbox.drain()
+        if batch:
+            p.conn.sendall(b"".join(batch))
+
+RESULT_PACKET = {"type": "round_result", "data": {
+    "round": 7, "winner": "alice",
+    "p1": {"name": "alice", "move": "rock", "score": 3},
+    "p2": {"name": "bob", "move": "scissors", "score": 1},
+    "outcome_p1": "win", "outcome_p2": "lose"}}
+
+# Benchmarks: each takes an iteration count and returns ops performed
+def bench_player_send(n):
+    # The server's send path: codec encode, queue, then the writer's flush
+    player = make_player("alice")
+    for _ in range(n):
+        player.send(RESULT_PACKET)
+        flush((player,))
+    return n
+
+def bench_recv_json_line(n):
+    data, _ = make_stream(n)
+    framer = LineFramer(CountingSocket(data))
+    for _ in range(n):
+        recv_json_line(framer)
+    return n
+
+def bench_determine(n):
+    determine = RpsServer.determine
+    pairs = [(a, b) for a in MOVES for b in MOVES] * (n // 9 + 1)
+    for a, b in pairs[:n]:
+        determine(a, b)
+    return n
+
+def bench_broadcast(n):
+    players = [make_player(f"p{i}") for i in range(FANOUT)]
+    match = Match(1, players[0], players[1], lambda delay, fn: None)
+    match.players = players  # broadcast walks whatever list it owns
+    for _ in range(n):
+        match.broadcast(RESULT_PACKET)
+        flush(players)
+    return n
+
+def bench_spectators(n):
+    a, b = make_player("alice"), make_player("bob")
+    match = Match(1, a, b, lambda delay, fn: None)
+    viewers = [make_player(f"v{i}") for i in range(SPECTATORS)]
+    for v in viewers:
+        match.watch(v)
+    flush(viewers)
+    for _ in range(n):
+        match.broadcast(RESULT_PACKET, spectators=True)
+        flush(viewers)
+    return n
+
+def bench_codec(codec):
+    def bench(n):
+        # Server encode plus client framing and decode of one round result
+        framer = codec.framer()
+        for _ in range(n):
+            framer.feed(codec.encode(RESULT_PACKET))
+            codec.decode(framer.pop())
+        return n
+    return bench
+
+def bench_register_move(n):
+    server = RpsServer()
+    server.rooms = RoomRegistry(lambda delay, fn: None)
+    a, b = make_player("alice"), make_player("bob")
+    server.rooms.join(a)
+    match = server.rooms.join(b)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(n):
+            match.start_round()
+            server.register_move(a, MOVES[i % 3])
+            server.register_move(b, MOVES[(i + 1) % 3])
+            flush((a, b))
+    return n
+
+BENCHMARKS = {
+    "player_send": (bench_player_send, 20000),
+    "recv_json_line": (bench_recv_json_line, 20000),
+    "determine": (bench_determine, 200000),
+    f"broadcast_fanout_{FANOUT}": (bench_broadcast, 500),
+    f"spectators_{SPECTATORS}": (bench_spectators, 200),
+    "register_move_round": (bench_register_move, 5000),
+    **{f"codec_{name}": (bench_codec(codec), 20000) for name, codec in CODECS.items()},
+}
+
+def run(names, repeat):
+    results = {}
+    for name in names:
+        fn, n = BENCHMARKS[name]
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter_ns()
+            ops = fn(n)
+            elapsed = time.perf_counter_ns() - t0
+            best = elapsed / ops if best is None else min(best, elapsed / ops)
+        results[name] = {"ns_per_op": round(best, 1), "ops": n}
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold):
+    """Names of benchmarks that got slower than the allowed threshold."""
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if before and now["ns_per_op"] > before["ns_per_op"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the protocol, rules and broadcast hot paths")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS),
+                        help="run only this benchmark (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown before a benchmark counts as a regression")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "benchmarks": run(args.only or list(BENCHMARKS), args.repeat),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'benchmark':<24} {'ns/op':>12} {'baseline':>12} {'change':>8}")
+        for name, r in report["benchmarks"].items():
+            before = (baseline or {}).get("benchmarks", {}).get(name)
+            if before:
+                change = r["ns_per_op"] / before["ns_per_op"] - 1
+                print(f"{name:<24} {r['ns_per_op']:>12.1f} {before['ns_per_op']:>12.1f} {change:>+8.1%}")
+            else:
+                print(f"{name:<24} {r['ns_per_op']:>12.1f} {'-':>12} {'':>8}")
+
+    if baseline is not None:
+        regressions = compare(report["benchmarks"], baseline, args.threshold)
+        if regressions:
+            print(f"REGRESSION (> {args.threshold:.0%} slower): {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
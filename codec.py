@@ -0,0 +1,128 @@
+import json, struct
+
+from framing import LineFramer, LengthFramer, LENGTH, FrameTooLarge
+from outcomes import MOVES, MOVE_CODES, OUTCOME_NAMES, TIE, WIN, LOSE
+
+try:
+    import orjson
+except ImportError:  # the standard library writes the same JSON, only slower
+    orjson = None
+
+# Wire codecs ------------------------------------------------------------------
+# A codec turns messages into frames and back and builds the framer for its
+# stream. A client names the codec it wants in its join data ("codec":
+# "binary"); join and join_ack always travel as JSON lines, and the codec
+# named in join_ack applies to every later frame in both directions. JSON
+# lines go through orjson when it is installed. The binary codec gives the
+# per-round messages fixed layouts behind a one-byte type code and carries
+# anything else as JSON after type code 0.
+
+class JsonCodec:
+    name = "json"
+
+    def encode(self, obj):
+        if orjson:
+            return orjson.dumps(obj) + b"\n"
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    def decode(self, frame):
+        return orjson.loads(frame) if orjson else json.loads(frame)
+
+    def framer(self, sock=None):
+        return LineFramer(sock)
+
+GENERIC, MOVE, START_ROUND, ROUND_RESULT, MATCH_OVER, PING, PONG, QUIT = range(8)
+BARE = {"ping": PING, "pong": PONG, "quit": QUIT}  # messages without data
+BARE_TYPES = {code: name for name, code in BARE.items()}
+NO_MOVE = 255  # a move that missed the deadline
+
+ROUND = struct.Struct("<BI")              # code, round; then the message text
+RESULT = struct.Struct("<BIBBIIBH")       # code, round, moves, scores, outcome_p1, len(p1 name)
+RESULT_FRAME = struct.Struct("<HBIBBIIBH")  # RESULT behind its length prefix, packed in one call
+MATCH_ID = struct.Struct("<BQ")
+MOVE_OR_NONE = {**MOVE_CODES, None: NO_MOVE}
+MOVE_NAMES = {**dict(enumerate(MOVES)), NO_MOVE: None}
+OUTCOME_CODES = {name: code for code, name in enumerate(OUTCOME_NAMES)}
+SIDES = {TIE: ("tie", "tie"), WIN: ("win", "lose"), LOSE: ("lose", "win")}  # outcome_p1 code -> both outcomes
+
+class BinaryCodec:
+    name = "binary"
+
+    def encode(self, obj):
+        if obj.get("type") == "round_result":  # most of the traffic; skips the generic path
+            try:
+                return self.result_frame(obj["data"])
+            except (AttributeError, KeyError, TypeError, struct.error):
+                pass
+        body = self.pack(obj)
+        if len(body) > 0xFFFF:
+            raise FrameTooLarge(f"message of {len(body)} bytes does not fit a binary frame")
+        return LENGTH.pack(len(body)) + body
+
+    @staticmethod
+    def result_frame(data):
+        # Six keys and every one looked up, so any other shape raises and goes as JSON
+        if len(data) != 6 or "winner" not in data or "outcome_p2" not in data:
+            raise KeyError("round_result")
+        p1, p2 = data["p1"], data["p2"]
+        name1, name2 = p1["name"].encode("utf-8"), p2["name"].encode("utf-8")
+        return RESULT_FRAME.pack(RESULT.size + len(name1) + len(name2), ROUND_RESULT, data["round"],
+                                 MOVE_OR_NONE[p1["move"]], MOVE_OR_NONE[p2["move"]], p1["score"], p2["score"],
+                                 OUTCOME_CODES[data["outcome_p1"]], len(name1)) + name1 + name2
+
+    def pack(self, obj):
+        mtype, data = obj.get("type"), obj.get("data")
+        try:
+            if len(obj) == 1 and mtype in BARE:
+                return bytes((BARE[mtype],))
+            if mtype == "move" and len(data) == 1:
+                return bytes((MOVE, MOVE_CODES[data["move"]]))
+            if mtype == "start_round" and len(data) == 2:
+                return ROUND.pack(START_ROUND, data["round"]) + data["message"].encode("utf-8")
+            if mtype == "match_over" and len(data) == 1:
+                return MATCH_ID.pack(MATCH_OVER, data["match"])
+        except (AttributeError, KeyError, TypeError, ValueError, struct.error):
+            pass  # not the usual shape; send it as JSON
+        return bytes((GENERIC,)) + (orjson.dumps(obj) if orjson else
+                                    json.dumps(obj, separators=(",", ":")).encode("utf-8"))
+
+    def decode(self, frame):
+        try:
+            code = frame[0]
+            if code == ROUND_RESULT:
+                _, round_index, m1, m2, s1, s2, outcome, n = RESULT.unpack_from(frame)
+                name1 = frame[RESULT.size:RESULT.size + n].decode("utf-8")
+                name2 = frame[RESULT.size + n:].decode("utf-8")
+                result1, result2 = SIDES[outcome]
+                return {"type": "round_result", "data": {
+                    "round": round_index,
+                    "winner": name1 if outcome == WIN else name2 if outcome == LOSE else None,
+                    "p1": {"name": name1, "move": MOVE_NAMES[m1], "score": s1},
+                    "p2": {"name": name2, "move": MOVE_NAMES[m2], "score": s2},
+                    "outcome_p1": result1, "outcome_p2": result2}}
+            if code == GENERIC:
+                return orjson.loads(frame[1:]) if orjson else json.loads(frame[1:])
+            if code in BARE_TYPES:
+                return {"type": BARE_TYPES[code]}
+            if code == MOVE:
+                return {"type": "move", "data": {"move": MOVES[frame[1]]}}
+            if code == START_ROUND:
+                _, round_index = ROUND.unpack_from(frame)
+                return {"type": "start_round", "data": {
+                    "round": round_index, "message": frame[ROUND.size:].decode("utf-8")}}
+            if code == MATCH_OVER:
+                return {"type": "match_over", "data": {"match": MATCH_ID.unpack_from(frame)[1]}}
+        except (IndexError, KeyError, struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"malformed binary frame: {e}") from None
+        raise ValueError(f"unknown binary message code {code}")
+
+    def framer(self, sock=None):
+        return LengthFramer(sock)
+
+JSON_LINES = JsonCodec()
+BINARY = BinaryCodec()
+CODECS = {codec.name: codec for codec in (JSON_LINES, BINARY)}
+
+def negotiate(name):
+    """The codec to use for a client that asked for name; JSON lines if unknown."""
+    return CODECS.get(name, JSON_LINES)
@@ -0,0 +1,72 @@
+import socket, threading, json, os, sys
+
+# Local control socket ---------------------------------------------------
+# A Unix socket that answers one-line admin commands with one JSON line,
+# e.g. "stats". Used by server workers and by the supervisor that
+# aggregates them.
+
+class ControlServer:
+    def __init__(self, path, commands):
+        self.path = path
+        self.commands = commands  # name -> callable(*args) returning a JSON-able value
+        self.sock = None
+        self.running = False
+
+    def start(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.path)
+        self.sock.listen(16)
+        self.running = True
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    def accept_loop(self):
+        while self.running:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        with conn:
+            try:
+                line = conn.makefile("rb").readline().decode("utf-8").split()
+                if not line:
+                    return
+                fn = self.commands.get(line[0])
+                if fn is None:
+                    reply = {"error": f"unknown command {line[0]!r}", "commands": sorted(self.commands)}
+                else:
+                    reply = fn(*line[1:])
+            except Exception as e:
+                reply = {"error": str(e)}
+            try:
+                conn.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+            except OSError:
+                pass
+
+    def stop(self):
+        self.running = False
+        try:
+            self.sock.close()
+            os.unlink(self.path)
+        except (OSError, AttributeError):
+            pass
+
+def query(path, command, timeout=2.0):
+    """Send one command to a control socket and return the decoded reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(path)
+        s.sendall(command.encode("utf-8") + b"\n")
+        return json.loads(s.makefile("rb").readline())
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python control.py CONTROL_SOCKET [command ...]")
+        sys.exit(2)
+    print(json.dumps(query(sys.argv[1], " ".join(sys.argv[2:]) or "stats"), indent=2))
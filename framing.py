@@ -0,0 +1,97 @@
+import json, struct
+from collections import deque
+
+# Buffered stream framing shared by gameserver, gameclient and asyncserver.
+# Reads arrive in large chunks; complete newline-delimited frames are split
+# out and any partial tail is carried over to the next read. LengthFramer
+# reads the same way but splits on a two-byte length prefix instead.
+
+CHUNK_SIZE = 64 * 1024
+MAX_FRAME = 64 * 1024
+
+class FrameTooLarge(ValueError):
+    pass
+
+def encode_json(obj):
+    """One message as a compact JSON line."""
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n"
+
+class LineFramer:
+    def __init__(self, sock=None, max_frame=MAX_FRAME, chunk_size=CHUNK_SIZE):
+        self.sock = sock
+        self.max_frame = max_frame
+        self.buf = bytearray()
+        self.pending = deque()
+        self._scan = 0  # bytes of buf already searched for a newline
+        self.chunk_size = chunk_size
+        self._chunk = None  # receive buffer, allocated on the first read_frame()
+        self._view = None
+
+    def feed(self, data):
+        """Append received bytes and queue every complete frame."""
+        buf = self.buf
+        buf += data
+        start = 0
+        nl = buf.find(b"\n", self._scan)
+        while nl != -1:
+            if nl - start > self.max_frame:
+                raise FrameTooLarge(f"frame of {nl - start} bytes exceeds {self.max_frame}")
+            self.pending.append(bytes(buf[start:nl]))
+            start = nl + 1
+            nl = buf.find(b"\n", start)
+        if start:
+            del buf[:start]
+        if len(buf) > self.max_frame:
+            raise FrameTooLarge(f"partial frame of {len(buf)} bytes exceeds {self.max_frame}")
+        self._scan = len(buf)
+
+    def leftover(self):
+        """Everything received but not yet returned, as raw stream bytes."""
+        return b"".join(frame + b"\n" for frame in self.pending) + bytes(self.buf)
+
+    def pop(self):
+        """Next complete frame, or None if none is buffered."""
+        return self.pending.popleft() if self.pending else None
+
+    def read_frame(self):
+        """Block on the socket until a full frame is available; None on EOF."""
+        if self._chunk is None:  # feed()-only users (asyncserver) never pay for it
+            self._chunk = bytearray(self.chunk_size)
+            self._view = memoryview(self._chunk)
+        while not self.pending:
+            n = self.sock.recv_into(self._chunk)
+            if not n:
+                return None
+            self.feed(self._view[:n])
+        return self.pending.popleft()
+
+    def __iter__(self):
+        while True:
+            frame = self.read_frame()
+            if frame is None:
+                return
+            yield frame
+
+LENGTH = struct.Struct("<H")
+
+class LengthFramer(LineFramer):
+    def __init__(self, sock=None, max_frame=MAX_FRAME, chunk_size=CHUNK_SIZE):
+        super().__init__(sock, min(max_frame, 0xFFFF), chunk_size)
+
+    def feed(self, data):
+        buf = self.buf
+        buf += data
+        start, size = 0, len(buf)
+        while size - start >= 2:
+            n = LENGTH.unpack_from(buf, start)[0]
+            if n > self.max_frame:
+                raise FrameTooLarge(f"frame of {n} bytes exceeds {self.max_frame}")
+            if size - start - 2 < n:
+                break
+            self.pending.append(bytes(buf[start + 2:start + 2 + n]))
+            start += 2 + n
+        if start:
+            del buf[:start]
+
+    def leftover(self):
+        return b"".join(LENGTH.pack(len(frame)) + frame for frame in self.pending) + bytes(self.buf)
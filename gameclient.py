@@ -1,30 +1,64 @@
 import tkinter as tk
 from tkinter import messagebox
-import socket, threading, json, sys
+import sys
+from collections import deque
+
+from rpsclient import RpsClient
+from resultpanel import ResultPanel
+from profiling import PROFILER
 
 SERVER_HOST_DEFAULT = "localhost"
 SERVER_PORT_DEFAULT = 12345
+CODEC = "json"  # wire format asked for in join; "binary" is smaller
+UI_TICK_MS = 30   # how often the Tk loop drains network updates
+UI_BATCH = 200    # most updates applied per tick, so a burst can't freeze the window
+TURBO = False     # start with result animations off
+
+# ---- Network to UI bridge ----
+class UiQueue:
+    """Carries widget updates from the listener thread to the Tk main loop.
+
+    Posting is a deque append, which needs no lock. An update posted with a
+    key supersedes any earlier one with that key still waiting, so a burst
+    of score or round changes costs one redraw.
+    """
+    def __init__(self, root, tick_ms=UI_TICK_MS, batch=UI_BATCH):
+        self.root = root
+        self.tick_ms = tick_ms
+        self.batch = batch
+        self.items = deque()
+        self.latest = {}  # key -> newest item posted with it
+
+    def post(self, fn, *args, key=None):
+        item = (key, fn, args)
+        if key is not None:
+            self.latest[key] = item
+        self.items.append(item)
+
+    def start(self):
+        self.root.after(self.tick_ms, self.tick)
+
+    def tick(self):
+        try:
+            self.drain(self.batch)
+        finally:
+            # Come straight back while a backlog remains
+            self.root.after(1 if self.items else self.tick_ms, self.tick)
 
-# ---- Networking helpers ----
-def send_json(sock, obj):
-    try:
-        sock.sendall(json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n")
-    except Exception:
-        raise
-
-def recv_json_line(sock):
-    buff = b""
-    while True:
-        chunk = sock.recv(1)
-        if not chunk:
-            return None
-        if chunk == b"\n":
-            break
-        buff += chunk
-    try:
-        return json.loads(buff.decode("utf-8"))
-    except Exception:
-        return None
+    def drain(self, limit):
+        """Run up to limit pending updates in order, skipping superseded ones."""
+        ran = 0
+        while self.items and ran < limit:
+            item = self.items.popleft()
+            key, fn, args = item
+            if key is not None and self.latest.get(key) is not item:
+                continue
+            ran += 1
+            try:
+                fn(*args)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+        return ran
 
 # ---- Styled button ----
 class ModernButton(tk.Button):
@@ -43,16 +77,19 @@ class RpsClientGUI:
         self.root.title("RPS Client")
         self.root.geometry("640x480")
         self.root.configure(bg="#1a1a2e")
-        self.sock = None
+        self.ui = UiQueue(self.root)
+        self.ui.start()
+        self.client = None  # RpsClient once connected
         self.player_name = ""
         self.state = "menu"
         self.move_buttons = {}
         self.status_var = tk.StringVar(value="Idle")
         self.score_var = tk.StringVar(value="Score: -")
         self.round_var = tk.StringVar(value="Round: -")
+        self.turbo_var = tk.BooleanVar(value=TURBO)
+        self.result_panel = None
         self.opponent_name = None
         self.build_menu()
-        self.listener_thread = None
         self.pending_move = None
 
     # UI builders -------------------------------------------------
@@ -112,7 +149,11 @@ class RpsClientGUI:
             btn.pack(side="left", padx=10, ipadx=14, ipady=10)
             self.move_buttons[mv] = btn
 
-        ModernButton(self.root, "Quit", self.quit_game, "#34495e", "#566573").pack(pady=15)
+        ModernButton(self.root, "Quit", self.quit_game, "#34495e", "#566573").pack(pady=(15, 4))
+        tk.Checkbutton(self.root, text="Turbo (no result animation)", variable=self.turbo_var,
+                       command=lambda: self.result_panel.set_turbo(self.turbo_var.get()),
+                       fg="#aaaaaa", bg="#1a1a2e", selectcolor="#2d2d44", activebackground="#1a1a2e").pack()
+        self.result_panel = ResultPanel(self.root, self.turbo_var.get())
         self.disable_moves()
 
     # Networking --------------------------------------------------
@@ -129,58 +170,73 @@ class RpsClientGUI:
             return
         self.player_name = name
         self.status_var.set("Connecting...")
+        client = RpsClient(name, host, port, CODEC)
+        client.on("message", lambda msg: PROFILER.call(msg.get("type", "unknown"), self.handle_message, msg))
+        client.on("reconnecting", lambda _: self.on_reconnecting())
+        client.on("disconnected", lambda _: self.on_disconnect())
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.connect((host, port))
+            client.connect()
         except Exception as e:
             messagebox.showerror("Connection Failed", str(e))
             return
-        # Send join
-        send_json(self.sock, {"type": "join", "data": {"name": self.player_name}})
+        self.client = client
         self.build_game()
-        self.listener_thread = threading.Thread(target=self.listen_loop, daemon=True)
-        self.listener_thread.start()
-
-    def listen_loop(self):
-        try:
-            while True:
-                msg = recv_json_line(self.sock)
-                if msg is None:
-                    self.on_disconnect()
-                    break
-                self.handle_message(msg)
-        except Exception:
-            self.on_disconnect()
 
     def handle_message(self, msg):
+        """Runs on the listener thread once RpsClient has absorbed msg; widgets go through self.ui."""
         t = msg.get("type")
         data = msg.get("data", {})
         if t == "join_ack":
-            self.status_var.set("Joined server. Waiting for players...")
+            if data.get("resumed"):
+                self.set_status("Reconnected")
+                self.ui.post(self.round_var.set, f"Round: {data.get('round')}", key="round")
+            else:
+                self.set_status("Joined server. Waiting for players...")
         elif t == "players":
-            players = data.get("players", [])
-            # Opponent name (any other)
-            opp = [p for p in players if p != self.player_name]
-            self.opponent_name = opp[0] if opp else None
-            self.opp_label.config(text=self.opponent_name or "Waiting...")
+            self.ui.post(self.show_players, data.get("players", []), key="players")
         elif t == "start_round":
-            self.round_var.set(f"Round: {data.get('round')}")
-            self.prompt_label.config(text=data.get("message", "Your move"))
-            self.pending_move = None
-            self.enable_moves()
+            self.ui.post(self.start_round, data, key="round")
         elif t == "round_result":
-            self.disable_moves()
-            self.show_result(data)
+            p1, p2 = data["p1"], data["p2"]
+            self.ui.post(self.score_var.set, f"Score: {p1['name']} {p1['score']} - {p2['name']} {p2['score']}",
+                         key="score")
+            self.ui.post(self.show_result, data)
         elif t == "opponent_left":
-            self.disable_moves()
-            self.prompt_label.config(text="Opponent left. Waiting...")
-            self.status_var.set("Opponent disconnected")
+            self.ui.post(self.disable_moves)
+            self.set_prompt("Opponent left. Waiting...")
+            self.set_status("Opponent disconnected")
+        elif t == "opponent_reconnecting":
+            self.set_status(f"Opponent lost connection, waiting up to {data.get('grace', 0):.0f}s")
+        elif t == "opponent_resumed":
+            self.set_status("Opponent reconnected")
         elif t == "error":
-            messagebox.showerror("Server Error", data.get("message", "Unknown error"))
+            self.ui.post(messagebox.showerror, "Server Error", data.get("message", "Unknown error"), key="error")
         else:
             # Unknown types ignored
             pass
 
+    # UI updates, run by the Tk loop -------------------------------
+    def set_status(self, text):
+        self.ui.post(self.status_var.set, text, key="status")
+
+    def set_prompt(self, text):
+        self.ui.post(self.show_prompt, text, key="prompt")
+
+    def show_prompt(self, text):
+        self.prompt_label.config(text=text)
+
+    def show_players(self, players):
+        # Opponent name (any other)
+        opp = [p for p in players if p != self.player_name]
+        self.opponent_name = opp[0] if opp else None
+        self.opp_label.config(text=self.opponent_name or "Waiting...")
+
+    def start_round(self, data):
+        self.round_var.set(f"Round: {data.get('round')}")
+        self.prompt_label.config(text=data.get("message", "Your move"))
+        self.pending_move = None
+        self.enable_moves()
+
     # Move submission
     def send_move(self, move):
         if self.pending_move:
@@ -189,7 +245,7 @@ class RpsClientGUI:
         self.disable_moves()
         self.prompt_label.config(text=f"You picked {move.upper()}. Waiting...")
         try:
-            send_json(self.sock, {"type": "move", "data": {"move": move}})
+            self.client.send_move(move)
         except Exception:
             self.on_disconnect()
 
@@ -198,21 +254,11 @@ class RpsClientGUI:
         p2 = data["p2"]
         you = p1 if p1["name"] == self.player_name else p2
         opp = p2 if you is p1 else p1
-        outcome = "Win ✅" if data["winner"] == self.player_name else ("Tie 🤝" if data["winner"] is None else "Lose ❌")
-        self.score_var.set(f"Score: {p1['name']} {p1['score']} - {p2['name']} {p2['score']}")
-        # Popup
-        popup = tk.Toplevel(self.root)
-        popup.title("Round Result")
-        popup.geometry("320x240")
-        popup.configure(bg="#1a1a2e")
-        tk.Label(popup, text=outcome, font=("Arial", 20, "bold"),
-                 fg=("#27ae60" if "Win" in outcome else "#f39c12" if "Tie" in outcome else "#e74c3c"),
-                 bg="#1a1a2e").pack(pady=16)
-        tk.Label(popup, text=f"You: {you['move'].upper()}\nOpponent: {opp['move'].upper()}",
-                 fg="white", bg="#1a1a2e", font=("Arial", 14)).pack(pady=8)
-        tk.Label(popup, text=self.score_var.get(), fg="#aaaaaa", bg="#1a1a2e").pack(pady=8)
-        ModernButton(popup, "OK", popup.destroy, "#3498db", "#5dade2").pack(pady=10)
-        popup.after(2500, popup.destroy)
+        self.disable_moves()
+        # A move is None when it missed the server's move deadline
+        self.result_panel.show(self.client.outcome(data),
+                               f"You: {(you['move'] or '-').upper()}\nOpponent: {(opp['move'] or '-').upper()}",
+                               self.score_var.get())
 
     # UI helpers --------------------------------------------------
     def enable_moves(self):
@@ -224,23 +270,21 @@ class RpsClientGUI:
             b.config(state="disabled")
 
     # Shutdown / errors -------------------------------------------
+    def on_reconnecting(self):
+        self.set_status("Connection lost. Reconnecting...")
+        self.ui.post(self.disable_moves)
+
     def on_disconnect(self):
-        self.status_var.set("Disconnected")
-        try:
-            self.disable_moves()
-        except:
-            pass
+        self.set_status("Disconnected")
+        self.ui.post(self.disable_moves)
 
     def quit_game(self):
-        try:
-            if self.sock:
-                send_json(self.sock, {"type": "quit"})
-                self.sock.close()
-        except:
-            pass
+        if self.client:
+            self.client.quit()
         self.root.destroy()
 
     def run(self):
+        PROFILER.install_signals("[CLIENT]")
         self.root.protocol("WM_DELETE_WINDOW", self.quit_game)
         self.root.mainloop()
 
@@ -1,59 +1,187 @@
-import socket, threading, json, time, sys
+import socket, threading, json, time, sys, argparse, signal, secrets, contextlib
+
+from framing import LineFramer, FrameTooLarge, encode_json
+from codec import JSON_LINES, negotiate
+from matches import RoomRegistry
+from outcomes import MOVE_CODES, determine
+from outbox import Outbox, OUTBOX_SIZE, DISCONNECT, COALESCE, POLICIES
+from timerwheel import TimerWheel
+from control import ControlServer
+from metrics import REGISTRY, MetricsServer
+from profiling import PROFILER, ProfiledLock
+from history import HistoryStore
+from recorder import SessionRecorder
+from heartbeat import IdleTracker, IDLE_TIMEOUT, REAP_INTERVAL
+from ratelimit import RateLimiter, MESSAGE_RATE, IP_RATE
 
 HOST = "0.0.0.0"
 PORT = 12345
-MAX_PLAYERS = 2
+MAX_PLAYERS = 20000
+SWEEP_INTERVAL = 1.0  # seconds between matchmaking window sweeps
+BACKLOG = 1024
+WRITE_TIMEOUT = 5.0  # seconds allowed to flush queued packets on close
+RESUME_GRACE = 30.0  # seconds a dropped player's match waits for them to reconnect
+
+CONNECTIONS = REGISTRY.counter("rps_connections", "TCP connections accepted")
+OPEN_CONNECTIONS = REGISTRY.gauge("rps_open_connections", "TCP connections currently open")
+DISCONNECTS = REGISTRY.counter("rps_disconnects", "Closed connections by reason", ["reason"])
+SEND_LATENCY = REGISTRY.histogram("rps_send_seconds", "Time to write one queued batch to a socket")
 
 # Message helpers -------------------------------------------------
 def send_json(conn, obj):
-    try:
-        data = json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n"
-        conn.sendall(data)
-    except Exception:
-        raise
+    conn.sendall(encode_json(obj))
+
+def recv_json_line(framer, guard=None, decode=json.loads):
+    """Read the next line‑delimited JSON message from a LineFramer.
 
-def recv_json_line(conn):
-    """Read until newline; simple line‑delimited JSON."""
-    buff = b""
+    Frames a FloodGuard refuses are dropped before decoding; decode turns
+    the frame into a message (a codec's decode for other framers).
+    """
     while True:
-        chunk = conn.recv(1)
-        if not chunk:
+        try:
+            line = framer.read_frame()
+        except (FrameTooLarge, OSError):
             return None
-        if chunk == b"\n":
+        if line is None:
+            return None
+        if guard is None or guard.allow():
             break
-        buff += chunk
     try:
-        return json.loads(buff.decode("utf-8"))
+        return decode(line)
     except Exception:
         return None
 
 # Core server -----------------------------------------------------
 class PlayerConn:
-    def __init__(self, conn, addr):
+    def __init__(self, conn, addr, outbox_size=OUTBOX_SIZE, policy=DISCONNECT):
         self.conn = conn
         self.addr = addr
         self.name = None
         self.move = None
+        self.move_at = 0.0
         self.score = 0
         self.active = True
+        self.match = None
+        self.close_reason = None
+        self.framer = LineFramer(conn)
+        self.codec = JSON_LINES  # until join negotiates another
+        self.outbox = Outbox(outbox_size, policy)
+        self.writer = None
+        self.recorder = None  # SessionRecorder while the server records
+        self.resume_token = None
+        self.guard = None     # FloodGuard while rate limiting is on
+        self.watching = None  # Match this connection spectates
+        self.rec_id = 0
+
+    def start_writer(self):
+        self.writer = threading.Thread(target=self.writer_loop, daemon=True)
+        self.writer.start()
+
+    def send(self, obj):
+        """Queue a packet for the writer; never blocks on the socket."""
+        self.send_bytes(obj.get("type"), self.codec.encode(obj))
+
+    def use_codec(self, codec):
+        """Switch both directions to codec; bytes already read are re-framed."""
+        if codec is self.codec:
+            return
+        leftover = self.framer.leftover()
+        self.framer = codec.framer(self.framer.sock)
+        self.framer.feed(leftover)
+        self.codec = codec
+
+    def send_bytes(self, mtype, data):
+        """Queue an already-encoded packet; broadcasts share one buffer."""
+        if self.recorder:
+            self.recorder.outbound(self, data)
+        if not self.outbox.put(mtype, data):
+            print(f"[SERVER] {self.name or self.addr} too slow, disconnecting")
+            self.close_reason = "slow_consumer"
+            self.abort()
+
+    def writer_loop(self):
+        try:
+            while True:
+                batch = self.outbox.get_batch()
+                if batch is None:
+                    break
+                t0 = time.perf_counter()
+                self.conn.sendall(b"".join(batch))
+                SEND_LATENCY.observe(time.perf_counter() - t0)
+        except OSError:
+            pass
+        finally:
+            self.abort()
+
+    def close(self):
+        """Flush whatever is queued, then close the socket."""
+        if self.writer is None:
+            self.abort()
+            return
+        try:
+            self.conn.settimeout(WRITE_TIMEOUT)
+        except OSError:
+            pass
+        self.outbox.close()
+
+    def abort(self):
+        """Close immediately; also wakes a reader blocked in recv."""
+        self.outbox.close()
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.conn.close()
+        except OSError:
+            pass
 
 class RpsServer:
-    def __init__(self, host=HOST, port=PORT):
+    def __init__(self, host=HOST, port=PORT, outbox_size=OUTBOX_SIZE, slow_policy=DISCONNECT,
+                 move_timeout=None, reuse_port=False, control_path=None, metrics_port=None,
+                 history_path=None, record_path=None, resume_grace=RESUME_GRACE, idle_timeout=IDLE_TIMEOUT,
+                 rate_limit=MESSAGE_RATE, ip_rate_limit=IP_RATE):
         self.host = host
         self.port = port
+        self.reuse_port = reuse_port
+        self.control_path = control_path
+        self.control = None
+        self.metrics_port = metrics_port
+        self.metrics = None
+        self.outbox_size = outbox_size
+        self.slow_policy = slow_policy
+        self.timers = TimerWheel()
         self.sock = None
-        self.lock = threading.Lock()
-        self.players = []  # list[PlayerConn]
-        self.round_index = 0
+        self.lock = ProfiledLock("lock:server")
+        self.players = set()  # every joined PlayerConn
+        self.resume_grace = resume_grace
+        self.suspended = {}   # resume token -> (dropped PlayerConn, grace timer)
+        self.sessions = {}    # resume token -> connected PlayerConn holding it
+        self.idle = IdleTracker(idle_timeout / 3, idle_timeout) if idle_timeout else None
+        self.limiter = RateLimiter(rate_limit, ip_rate_limit) if rate_limit or ip_rate_limit else None
+        self.history = HistoryStore(history_path) if history_path else None
+        self.recorder = SessionRecorder(record_path) if record_path else None
+        # While recording, every event is logged and applied under one lock,
+        # so the log order is the order the threads' effects happened in
+        self.serial = threading.RLock() if self.recorder else contextlib.nullcontext()
+        self.rooms = RoomRegistry(self.call_later, move_timeout=move_timeout, history=self.history)
         self.running = True
 
     def start(self):
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.sock.bind((self.host, self.port))
-        self.sock.listen(5)
+        self.sock.listen(BACKLOG)
         print(f"[SERVER] Listening on {self.host}:{self.port}")
         threading.Thread(target=self.accept_loop, daemon=True).start()
+        self.timers.start()
+        self.start_control()
+        self.start_metrics()
+        with self.serial:
+            self.sweep_lobby()
+            self.reap_idle()
         try:
             while self.running:
                 time.sleep(0.5)
@@ -72,154 +200,472 @@ class RpsServer:
             threading.Thread(target=self.handle_client, args=(conn, addr), daemon=True).start()
 
     def handle_client(self, conn, addr):
-        player = PlayerConn(conn, addr)
+        player = PlayerConn(conn, addr, self.outbox_size, self.slow_policy)
         print(f"[SERVER] Connection from {addr}")
-        # First message must be join
-        first = recv_json_line(conn)
-        if not first or first.get("type") != "join":
-            send_json(conn, {"type": "error", "data": {"message": "Expected join"}})
-            conn.close()
-            return
-        player.name = first["data"].get("name", f"Player{int(time.time())}")
+        CONNECTIONS.inc()
+        OPEN_CONNECTIONS.inc()
+        try:
+            admitted = False
+            try:
+                self.track(player)
+                player.start_writer()
+                # First message must be join
+                first = recv_json_line(player.framer, player.guard, player.codec.decode)
+                with self.serial:
+                    admitted = PROFILER.call("join", self.admit, player, first)
+            except Exception as e:
+                print(f"[SERVER] Bad join from {addr}: {e}")
+            finally:
+                if not admitted:
+                    self.reject(player)
+            if not admitted:
+                return
+            reason = "eof"
+            try:
+                while self.running and player.active:
+                    msg = recv_json_line(player.framer, player.guard, player.codec.decode)
+                    if msg is None:
+                        break
+                    with self.serial:
+                        keep = self.handle_message(player, msg)
+                    if not keep:
+                        reason = "quit"
+                        break
+            except Exception as e:
+                reason = "error"
+                print(f"[SERVER] Error with {player.name}: {e}")
+            finally:
+                with self.serial:
+                    self.disconnect(player, reason)
+        finally:
+            OPEN_CONNECTIONS.dec()
+
+    # Engine-independent protocol handling ---------------------------
+    def track(self, player):
+        """Register a new connection with the recorder, reaper and rate limiter."""
+        if self.recorder:
+            self.recorder.attach(player)
+        if self.idle:
+            self.idle.touch(player)
+        if self.limiter:
+            player.guard = self.limiter.guard(player.addr[0], lambda: self.flooded(player))
+
+    def untrack(self, player):
+        if self.idle:
+            self.idle.remove(player)
+        if player.guard:
+            player.guard = None
+            self.limiter.release(player.addr[0])
+
+    def reject(self, player):
+        """Close a connection whose join handshake failed, flushing any error reply."""
+        with self.lock:
+            self.players.discard(player)
+        DISCONNECTS.labels(player.close_reason or "rejected").inc()
+        self.untrack(player)
+        player.close()
+
+    def flooded(self, player):
+        print(f"[SERVER] {player.name or player.addr} kept flooding, disconnecting")
+        player.close_reason = "flood"
+        player.abort()
+
+    def send_error(self, player, message):
+        """Error replies are capped per connection so bad input can't amplify."""
+        if player.guard is None or player.guard.may_reply_error():
+            player.send({"type": "error", "data": {"message": message}})
+
+    def admit(self, player, first):
+        """Handle the join handshake; False means the connection must be closed."""
+        if self.recorder and first:
+            self.recorder.inbound(player, encode_json(first))
+        if self.idle and first:
+            self.idle.touch(player)
+        mtype = first.get("type") if isinstance(first, dict) else None
+        data = first.get("data") if mtype in ("join", "spectate") else None
+        if not isinstance(data, dict):
+            self.send_error(player, "Expected join")
+            return False
+        name = data.get("name", f"Player{int(time.time())}")
+        valid = isinstance(name, str) and name != ""
+        if not (valid and all(isinstance(data.get(key), (str, type(None))) for key in ("resume_token", "codec"))):
+            self.send_error(player, "Malformed join")
+            return False
+        player.name = name
         with self.lock:
             if len(self.players) >= MAX_PLAYERS:
-                send_json(conn, {"type": "error", "data": {"message": "Server full"}})
-                conn.close()
+                player.send({"type": "error", "data": {"message": "Server full"}})
                 print(f"[SERVER] Rejected {player.name} (full)")
-                return
-            self.players.append(player)
-            idx = len(self.players)
-        send_json(conn, {"type": "join_ack", "data": {"player_index": idx, "message": "Joined"}})
-        self.broadcast_player_status()
+                return False
+            self.players.add(player)
+            token = data.get("resume_token") if mtype == "join" else None
+            session = self.suspended.pop(token, None)
+            # The old socket may still look open (a half-open mobile link);
+            # the new connection takes its seat rather than waiting for the reaper
+            live = self.sessions.pop(token, None) if session is None else None
+            if live is not None:
+                live.active = False
+                self.players.discard(live)
+        player.use_codec(negotiate(data.get("codec")))
+        if mtype == "spectate":
+            # Viewers only need the latest result, so a slow one coalesces
+            # instead of being disconnected
+            player.outbox.policy = COALESCE
+            self.send_ack(player, {"spectator": True, "message": "Spectating"})
+            self.spectate(player, data)
+            return True
+        if self.resume_grace:
+            player.resume_token = self.new_resume_token(player)
+            with self.lock:
+                self.sessions[player.resume_token] = player
+        if session:
+            old, timer = session
+            timer.cancel()
+            if self.resume(old, player):
+                return True
+        elif live is not None:
+            self.retire(live)
+            if self.resume(live, player):
+                return True
+            self.leave(live)  # still in the lobby, or its match is over
+        self.enqueue(player, ack=True)
+        return True
+
+    def new_resume_token(self, player):
+        return secrets.token_urlsafe(16)
+
+    def send_ack(self, player, data):
+        """join_ack goes out as a JSON line; the codec it names applies after it."""
+        data["codec"] = player.codec.name
+        player.send_bytes("join_ack", encode_json({"type": "join_ack", "data": data}))
 
-        # If now enough players start first round
-        self.maybe_start_round()
+    def retire(self, old):
+        """Close a connection whose player has reconnected on another one."""
+        print(f"[SERVER] {old.name} reconnected, closing their old connection")
+        old.close_reason = "replaced"
+        DISCONNECTS.labels("replaced").inc()
+        self.untrack(old)
+        if self.recorder:
+            self.recorder.closed(old)
+        old.abort()  # its reader wakes, finds it inactive and leaves the seat alone
 
+    def resume(self, old, player):
+        """Put a reconnected player back into the match they dropped from."""
+        match = old.match
+        seat = match.replace(old, player) if match else None
+        if seat is None:  # the match ended while they were away
+            return False
+        index, in_round = seat
+        player.name = old.name
+        print(f"[SERVER] {player.name} resumed match {match.id}")
+        self.send_ack(player, {
+            "player_index": index + 1, "message": "Resumed", "resumed": True,
+            "resume_token": player.resume_token, "resume_grace": self.resume_grace,
+            "round": match.round_index, "score": player.score})
+        player.send({"type": "players", "data": {"players": [p.name for p in match.players], "match": match.id}})
+        if in_round and player.move is None:
+            player.send({"type": "start_round", "data": {
+                "round": match.round_index, "message": f"Round {match.round_index} - choose your move"}})
+        other = match.players[1 - index]
+        if other.active:
+            other.send({"type": "opponent_resumed", "data": {"message": f"{player.name} is back"}})
+        return True
+
+    def spectate(self, player, data):
+        """Subscribe a connection to the round results of data["match"]."""
+        if player.watching:
+            player.watching.unwatch(player)
         try:
-            while self.running and player.active:
-                msg = recv_json_line(conn)
-                if msg is None:
-                    break
-                mtype = msg.get("type")
-                if mtype == "move":
-                    self.register_move(player, msg["data"]["move"])
-                elif mtype == "quit":
-                    break
-                else:
-                    send_json(conn, {"type": "error", "data": {"message": "Unknown type"}})
-        except Exception as e:
-            print(f"[SERVER] Error with {player.name}: {e}")
-        finally:
-            self.disconnect(player)
+            match = self.rooms.matches.get(int(data.get("match")))
+        except (TypeError, ValueError):
+            match = None
+        error = match.watch(player) if match else "No such match"
+        if error:
+            self.send_error(player, error)
+
+    def enqueue(self, player, ack=False):
+        """Put a player in the lobby; starts a match as soon as a pair exists."""
+        match = self.rooms.join(player)
+        if ack:
+            idx = 2 if match else 1
+            ack_data = {"player_index": idx, "message": "Joined"}
+            if player.resume_token:
+                ack_data.update(resume_token=player.resume_token, resume_grace=self.resume_grace)
+            self.send_ack(player, ack_data)
+        if match:
+            self.start_match(match)
+        else:
+            player.send({"type": "players", "data": {"players": [player.name]}})
+
+    def start_match(self, match):
+        print(f"[SERVER] Match {match.id}: {match.players[0].name} vs {match.players[1].name}")
+        match.start()
 
-    def broadcast_player_status(self):
-        names = [p.name for p in self.players if p.active]
-        payload = {"type": "players", "data": {"players": names}}
-        self.broadcast(payload)
+    def sweep_lobby(self):
+        """Pair players whose rating window has widened; reschedules itself."""
+        if not self.running:
+            return
+        for match in self.rooms.sweep():
+            self.start_match(match)
+        self.call_later(SWEEP_INTERVAL, self.sweep_lobby)
+
+    def reap_idle(self):
+        """Ping quiet connections and close dead ones; reschedules itself."""
+        if not self.running or self.idle is None:
+            return
+        to_ping, to_close = self.idle.sweep()
+        for player in to_ping:
+            player.send({"type": "ping"})
+        for player in to_close:
+            # Aborting wakes the reader, which runs the normal disconnect path
+            player.close_reason = "idle"
+            player.abort()
+        if to_close:
+            print(f"[SERVER] Closed {len(to_close)} idle connections")
+        self.call_later(REAP_INTERVAL, self.reap_idle)
+
+    def stats(self):
+        stats = self.rooms.stats()
+        stats["players"] = len(self.players)
+        return stats
+
+    def start_metrics(self):
+        if self.metrics_port is None:
+            return
+        REGISTRY.gauge("rps_players", "Players joined").set_function(lambda: len(self.players))
+        REGISTRY.gauge("rps_active_matches", "Matches in progress").set_function(
+            lambda: len(self.rooms.matches))
+        REGISTRY.gauge("rps_waiting_players", "Players in the matchmaking queue").set_function(
+            lambda: len(self.rooms.matchmaker))
+        REGISTRY.gauge("rps_queue_time_p95_seconds", "95th percentile matchmaking wait").set_function(
+            lambda: self.rooms.matchmaker.stats.snapshot()["p95"])
+        REGISTRY.gauge("rps_outbox_depth", "Packets queued across all connections").set_function(
+            self.outbox_depth)
+        REGISTRY.gauge("rps_pending_timers", "Timers waiting on the timer wheel").set_function(
+            lambda: len(self.timers))
+        self.metrics = MetricsServer(self.metrics_port)
+        self.metrics.start()
+        print(f"[SERVER] Metrics on http://127.0.0.1:{self.metrics_port}/metrics")
 
-    def maybe_start_round(self):
+    def outbox_depth(self):
         with self.lock:
-            if len([p for p in self.players if p.active]) == 2:
-                # Reset moves
-                for p in self.players:
-                    p.move = None
-                self.round_index += 1
-                self.broadcast({
-                    "type": "start_round",
-                    "data": {
-                        "round": self.round_index,
-                        "message": f"Round {self.round_index} - choose your move"
-                    }
-                })
+            players = list(self.players)
+        return sum(len(p.outbox) for p in players)
+
+    def control_commands(self):
+        return {"stats": self.stats, "profile": PROFILER.command, "history": self.lookup_history,
+                "leaderboard": self.rooms.leaderboard.command}
+
+    def lookup_history(self, kind="", key=""):
+        """Control command: history player NAME | history match ID."""
+        if self.history is None:
+            return {"error": "history is off; start the server with --history PATH"}
+        if kind == "player":
+            return {"records": self.history.by_player(key)}
+        if kind == "match" and key.isdigit():
+            return {"records": self.history.by_match(key)}
+        return {"error": "usage: history player NAME | history match ID"}
+
+    def start_control(self):
+        if self.control_path:
+            self.control = ControlServer(self.control_path, self.control_commands())
+            self.control.start()
+
+    def handle_message(self, player, msg):
+        """Dispatch one message; False ends the session."""
+        if self.recorder:
+            self.recorder.inbound(player, encode_json(msg))
+        if self.idle:
+            self.idle.touch(player)
+        if PROFILER.enabled:
+            key = msg.get("type") if msg.get("type") in ("move", "spectate", "ping", "pong", "quit") else "unknown"
+            return PROFILER.call(key, self.dispatch, player, msg)
+        return self.dispatch(player, msg)
+
+    def dispatch(self, player, msg):
+        mtype = msg.get("type")
+        if mtype == "move":
+            self.register_move(player, msg["data"]["move"])
+        elif mtype == "spectate" and player.match is None:
+            self.spectate(player, msg["data"])
+        elif mtype == "ping":
+            player.send({"type": "pong"})
+        elif mtype == "pong":
+            pass  # only here to count as activity
+        elif mtype == "quit":
+            return False
+        else:
+            self.send_error(player, "Unknown type")
+        return True
+
+    def call_later(self, delay, fn):
+        """Schedule fn; returns a handle with cancel()."""
+        if self.recorder:
+            fn = self.recorded_timer(fn)
+        return self.schedule(delay, fn)
+
+    def recorded_timer(self, fn):
+        # Timer firings are logged so replay runs each one where it really
+        # ran, not where a late wheel tick would put it on the virtual clock
+        timer_id = self.recorder.next_timer()
+
+        def fire():
+            with self.serial:
+                self.recorder.timer(timer_id)
+                fn()
+        return fire
+
+    def schedule(self, delay, fn):
+        return self.timers.call_later(delay, fn)
 
     def register_move(self, player, move):
-        if move not in ("rock", "paper", "scissors"):
-            send_json(player.conn, {"type": "error", "data": {"message": "Invalid move"}})
+        if move not in MOVE_CODES:
+            self.send_error(player, "Invalid move")
             return
-        with self.lock:
-            if player.move is not None:
-                send_json(player.conn, {"type": "error", "data": {"message": "Move already submitted"}})
-                return
-            player.move = move
-            print(f"[SERVER] {player.name} -> {move}")
-            all_submitted = all(p.move for p in self.players if p.active)
-            if all_submitted and len(self.players) == 2:
-                self.evaluate_round()
-
-    def evaluate_round(self):
-        p1, p2 = self.players
-        m1, m2 = p1.move, p2.move
-        result1 = self.determine(m1, m2)
-        # Update scores
-        if result1 == "win":
-            p1.score += 1
-            winner = p1.name
-        elif result1 == "lose":
-            p2.score += 1
-            winner = p2.name
+        match = player.match
+        if match is None:
+            self.send_error(player, "Waiting for opponent")
+            return
+        error = match.register_move(player, move)
+        if error:
+            self.send_error(player, error)
         else:
-            winner = None
-        result_packet = {
-            "type": "round_result",
-            "data": {
-                "round": self.round_index,
-                "winner": winner,
-                "p1": {"name": p1.name, "move": m1, "score": p1.score},
-                "p2": {"name": p2.name, "move": m2, "score": p2.score},
-                "outcome_p1": result1,
-                "outcome_p2": "tie" if result1 == "tie" else ("win" if result1 == "lose" else "lose")
-            }
-        }
-        self.broadcast(result_packet)
-        # Start next round after short pause
-        threading.Timer(0.5, self.maybe_start_round).start()
-
-    @staticmethod
-    def determine(a, b):
-        if a == b:
-            return "tie"
-        rules = {"rock": "scissors", "paper": "rock", "scissors": "paper"}
-        return "win" if rules[a] == b else "lose"
-
-    def broadcast(self, obj):
-        dead = []
-        for p in self.players:
-            if not p.active:
-                continue
-            try:
-                send_json(p.conn, obj)
-            except Exception:
-                dead.append(p)
-        for p in dead:
-            self.disconnect(p)
+            print(f"[SERVER] {player.name} -> {move}")
+
+    determine = staticmethod(determine)
 
-    def disconnect(self, player):
+    def disconnect(self, player, reason="eof"):
+        # A dropped (not quitting) player in a match keeps it for the grace
+        # window; their opponent is told to wait
+        suspend = (reason != "quit" and player.close_reason != "flood" and self.running
+                   and player.resume_token is not None and player.match is not None)
         with self.lock:
             if not player.active:
                 return
             player.active = False
-        try:
-            player.conn.close()
-        except:
-            pass
+            self.players.discard(player)
+            self.sessions.pop(player.resume_token, None)
+            if suspend:
+                timer = self.call_later(self.resume_grace, lambda: self.expire_session(player.resume_token))
+                self.suspended[player.resume_token] = (player, timer)
+        DISCONNECTS.labels(player.close_reason or reason).inc()
+        self.untrack(player)
+        if self.recorder:
+            self.recorder.closed(player)
+        player.close()
+        if suspend:
+            print(f"[SERVER] {player.name} dropped, holding their match for {self.resume_grace}s")
+            match = player.match  # None if the opponent has already left
+            other = match and (match.players[1] if match.players[0] is player else match.players[0])
+            if other and other.active:
+                other.send({"type": "opponent_reconnecting", "data": {
+                    "message": f"{player.name} lost connection", "grace": self.resume_grace}})
+            return
         print(f"[SERVER] {player.name} disconnected")
-        # Inform remaining
-        self.broadcast({"type": "opponent_left", "data": {"message": f"{player.name} left"}})
+        self.leave(player)
+
+    def expire_session(self, token):
+        with self.lock:
+            session = self.suspended.pop(token, None)
+        if session:
+            print(f"[SERVER] {session[0].name} did not come back")
+            self.leave(session[0])
+
+    def leave(self, player):
+        if player.watching:
+            player.watching.unwatch(player)
+        # Inform the opponent and send them back to the lobby
+        survivor = self.rooms.leave(player)
+        if survivor:
+            survivor.send({"type": "opponent_left", "data": {"message": f"{player.name} left"}})
+            self.enqueue(survivor)
 
     def shutdown(self):
         self.running = False
+        self.timers.stop()
+        if self.control:
+            self.control.stop()
+        if self.metrics:
+            self.metrics.stop()
         try:
             self.sock.close()
         except:
             pass
-        for p in self.players:
-            try:
-                p.conn.close()
-            except:
-                pass
+        for p in list(self.players):
+            p.close()
+        if self.history:
+            self.history.close()
+        if self.recorder:
+            self.recorder.close()
         print("[SERVER] Closed.")
 
-if __name__ == "__main__":
+def raise_nofile_limit():
+    """Lift the soft fd limit to the hard limit so many sockets can stay open."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+def make_server(args, reuse_port=False, control_path=None):
+    kwargs = dict(outbox_size=args.outbox_size, slow_policy=args.slow_policy,
+                  move_timeout=args.move_timeout, reuse_port=reuse_port, control_path=control_path,
+                  metrics_port=args.metrics_port, history_path=args.history,
+                  record_path=args.record, resume_grace=args.resume_grace,
+                  idle_timeout=args.idle_timeout, rate_limit=args.rate_limit,
+                  ip_rate_limit=args.ip_rate_limit)
+    if args.engine == "asyncio":
+        from asyncserver import AsyncRpsServer
+        return AsyncRpsServer(args.host, args.port, **kwargs)
+    return RpsServer(args.host, args.port, **kwargs)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rock-Paper-Scissors Server")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--engine", choices=("threads", "asyncio"), default="threads",
+                        help="threads: one OS thread per connection; asyncio: single event loop")
+    parser.add_argument("--outbox-size", type=int, default=OUTBOX_SIZE,
+                        help="packets queued per connection before the slow-consumer policy applies")
+    parser.add_argument("--slow-policy", choices=POLICIES, default=DISCONNECT)
+    parser.add_argument("--move-timeout", type=float, default=None,
+                        help="seconds to submit a move before it counts as a loss")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes sharing the port through SO_REUSEPORT")
+    parser.add_argument("--control", default=None,
+                        help="Unix control socket path (default with --workers: /tmp/rps-PORT.ctl)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus metrics on 127.0.0.1:PORT/metrics (worker i uses PORT+i)")
+    parser.add_argument("--history", default=None,
+                        help="append every round result to this log file (worker i uses PATH.w<i>)")
+    parser.add_argument("--record", default=None,
+                        help="record every protocol event for replay.py; .gz compresses (worker i uses PATH.w<i>)")
+    parser.add_argument("--resume-grace", type=float, default=RESUME_GRACE,
+                        help="seconds a dropped player's match is held for them to reconnect (0 = off)")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="close connections silent this long; pinged after a third of it (0 = off)")
+    parser.add_argument("--rate-limit", type=float, default=MESSAGE_RATE,
+                        help="messages/s allowed per connection, bursts of twice that (0 = off)")
+    parser.add_argument("--ip-rate-limit", type=float, default=IP_RATE,
+                        help="messages/s allowed per source address across its connections (default 0 = off)")
+    args = parser.parse_args(argv)
+    raise_nofile_limit()
     print("Rock-Paper-Scissors Server")
-    print(f"Listening on {HOST}:{PORT}")
-    RpsServer().start()
+    print(f"Listening on {args.host}:{args.port} ({args.engine} engine)")
+    if args.workers > 1:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            parser.error("--workers needs SO_REUSEPORT, which this platform lacks")
+        from supervisor import Supervisor
+        Supervisor(args).run()
+    else:
+        PROFILER.install_signals("[SERVER]")
+        signal.signal(signal.SIGTERM, signal.default_int_handler)  # shut down cleanly, like Ctrl+C
+        make_server(args, control_path=args.control).start()
+
+if __name__ == "__main__":
+    main()
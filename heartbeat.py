@@ -0,0 +1,56 @@
+import threading, time
+from collections import OrderedDict
+
+# Heartbeats and idle reaping ------------------------------------------------------
+# Every message from a connection counts as activity. A connection silent
+# for PING_AFTER seconds is sent a ping; one still silent IDLE_TIMEOUT seconds
+# after its last message is closed. Both stages are OrderedDicts kept in the
+# order their timestamps were taken, so one sweep pops only the entries that
+# are due, however many connections are open.
+
+PING_AFTER = 20.0
+IDLE_TIMEOUT = 60.0
+REAP_INTERVAL = 1.0
+
+class IdleTracker:
+    def __init__(self, ping_after=PING_AFTER, idle_timeout=IDLE_TIMEOUT, clock=time.monotonic):
+        self.ping_after = ping_after
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.active = OrderedDict()  # conn -> last activity, oldest first
+        self.pinged = OrderedDict()  # conn -> last activity, pinged and awaiting any reply
+
+    def touch(self, conn):
+        now = self.clock()
+        with self.lock:
+            self.pinged.pop(conn, None)
+            self.active[conn] = now
+            self.active.move_to_end(conn)
+
+    def remove(self, conn):
+        with self.lock:
+            self.active.pop(conn, None)
+            self.pinged.pop(conn, None)
+
+    def sweep(self):
+        """Returns (connections to ping, connections to close)."""
+        now = self.clock()
+        to_ping, to_close = [], []
+        with self.lock:
+            ping_before = now - self.ping_after
+            while self.active:
+                conn, last = next(iter(self.active.items()))
+                if last > ping_before:
+                    break
+                del self.active[conn]
+                self.pinged[conn] = last  # later activity means later pings, so order holds
+                to_ping.append(conn)
+            close_before = now - self.idle_timeout
+            while self.pinged:
+                conn, last = next(iter(self.pinged.items()))
+                if last > close_before:
+                    break
+                del self.pinged[conn]
+                to_close.append(conn)
+        return to_ping, to_close
@@ -0,0 +1,348 @@
+import os, struct, threading, time, mmap, hashlib, heapq, sys, json
+
+from outcomes import MOVES, MOVE_CODES, OUTCOME_NAMES
+
+# Match history store -------------------------------------------------------------
+# Round results are appended to a log of fixed-width binary records, written
+# in groups and fsynced once per group. Each key (match id, player id) is
+# indexed by a short list of sorted runs, one file per consecutive range of
+# records, memory-mapped and binary-searched, so a lookup costs O(log n) per
+# run plus the matches. An indexer thread turns every REINDEX_EVERY new
+# records into a run and merges RUN_FANOUT runs of the same size tier into
+# one, so each entry is rewritten O(log n) times instead of on every
+# reindex, and the flush thread never waits for it. Records appended since
+# the last run are found by scanning the short unindexed tail.
+
+RECORD = struct.Struct("<QIQQBBBxd")   # match, round, p1, p2, move1, move2, outcome, pad, time
+ENTRY = struct.Struct("<QQ")           # key, record number
+INDEX_HEADER = struct.Struct("<8sQQ")  # magic, first record, end of records covered
+INDEX_MAGIC = b"RPSIDX2\0"
+NO_MOVE = 255
+
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.2
+REINDEX_EVERY = 100000
+RUN_FANOUT = 4     # runs of one size tier merged together
+READ_ENTRIES = 65536
+SORT_SLICE = 16384  # entries per list.sort(), which holds the GIL throughout
+
+def player_id(name):
+    """Stable 64-bit id for a player name."""
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
+
+class SortedIndex:
+    """Read-only view of one index run: sorted (key, record) pairs."""
+    def __init__(self, path):
+        self.path = path
+        self.start = self.covered = 0
+        self.count = 0
+        self.map = None
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < INDEX_HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.start, self.covered = INDEX_HEADER.unpack_from(self.map, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a history index")
+        self.count = (size - INDEX_HEADER.size) // ENTRY.size
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def entry(self, i):
+        return ENTRY.unpack_from(self.map, INDEX_HEADER.size + i * ENTRY.size)
+
+    def __iter__(self):
+        # Block reads copy out of the map, so close() never meets a live export
+        for first in range(0, self.count, READ_ENTRIES):
+            offset = INDEX_HEADER.size + first * ENTRY.size
+            yield from ENTRY.iter_unpack(self.map[offset:offset + min(READ_ENTRIES, self.count - first) * ENTRY.size])
+
+    def lookup(self, key):
+        """Record numbers stored under key, via binary search."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        while lo < self.count:
+            k, rec = self.entry(lo)
+            if k != key:
+                break
+            found.append(rec)
+            lo += 1
+        return found
+
+class IndexRuns:
+    """All the runs of one index, ordered by the records they cover."""
+    def __init__(self, base, records, unit):
+        self.base = base
+        self.unit = unit
+        self.runs = []
+        self.load(records)
+
+    def load(self, records):
+        """Open the runs that chain from record 0; drop merged-away or stale ones."""
+        folder, prefix = os.path.split(self.base)
+        found = []
+        for name in os.listdir(folder or "."):
+            if not name.startswith(prefix + "."):
+                continue
+            path = os.path.join(folder, name)
+            if name.endswith(".tmp"):
+                os.remove(path)  # a merge that never finished
+                continue
+            try:
+                run = SortedIndex(path)
+            except ValueError:
+                continue
+            found.append(run)
+        found.sort(key=lambda run: (run.start, -run.covered))
+        covered = 0
+        for run in found:
+            if run.start == covered and run.covered <= records:
+                self.runs.append(run)
+                covered = run.covered
+            else:
+                # Inputs of a merge that crashed before removing them, or runs
+                # past a log that was cut back; the tail scan covers the rest
+                run.close()
+                os.remove(run.path)
+
+    @property
+    def covered(self):
+        return self.runs[-1].covered if self.runs else 0
+
+    def lookup(self, key):
+        found = []
+        for run in self.runs:
+            found.extend(run.lookup(key))
+        return found
+
+    def last_key(self):
+        return max((run.entry(run.count - 1)[0] for run in self.runs if run.count), default=0)
+
+    def tier(self, run):
+        n, size, tier = run.covered - run.start, self.unit * RUN_FANOUT, 0
+        while n >= size:
+            size *= RUN_FANOUT
+            tier += 1
+        return tier
+
+    def write(self, entries, start, end):
+        """Write a sorted run covering records [start, end); returns its path."""
+        tmp = self.base + ".tmp"
+        with open(tmp, "wb") as out:
+            out.write(INDEX_HEADER.pack(INDEX_MAGIC, start, end))
+            buf = []
+            for entry in entries:
+                buf.append(ENTRY.pack(*entry))
+                if len(buf) >= READ_ENTRIES:
+                    out.write(b"".join(buf))
+                    buf.clear()
+            out.write(b"".join(buf))
+            out.flush()
+            os.fsync(out.fileno())
+        path = f"{self.base}.{start:012d}-{end:012d}"
+        os.replace(tmp, path)
+        return path
+
+    def compact(self, io_lock):
+        """Merge the newest RUN_FANOUT runs while they share a size tier."""
+        while len(self.runs) >= RUN_FANOUT:
+            group = self.runs[-RUN_FANOUT:]
+            if len({self.tier(run) for run in group}) > 1:
+                return
+            merged = SortedIndex(self.write(heapq.merge(*group), group[0].start, group[-1].covered))
+            with io_lock:
+                self.runs[-RUN_FANOUT:] = [merged]
+            for run in group:
+                run.close()
+                os.remove(run.path)
+
+    def close(self):
+        for run in self.runs:
+            run.close()
+
+class HistoryStore:
+    def __init__(self, path, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 reindex_every=REINDEX_EVERY):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.reindex_every = reindex_every
+        self.pending = []
+        self.lock = threading.Lock()            # guards pending
+        self.io_lock = threading.Lock()         # serialises log writes and index swaps
+        self.reindex_lock = threading.Lock()    # one indexing pass at a time
+        self.wake = threading.Event()
+        self.index_wake = threading.Event()
+        self.records = self.repair(path)
+        self.log = open(path, "ab")
+        self.by_match_index = IndexRuns(path + ".midx", self.records, reindex_every)
+        self.by_player_index = IndexRuns(path + ".pidx", self.records, reindex_every)
+        self.running = True
+        self.thread = threading.Thread(target=self.flush_loop, daemon=True)
+        self.thread.start()
+        self.indexer = threading.Thread(target=self.index_loop, daemon=True)
+        self.indexer.start()
+
+    @staticmethod
+    def repair(path):
+        """Cut a torn last record left by a crash mid-write; returns the record count."""
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
+        if size % RECORD.size:
+            # Anything appended after a partial record would be misaligned
+            os.truncate(path, size - size % RECORD.size)
+        return size // RECORD.size
+
+    # Writing ----------------------------------------------------------------
+    def append(self, match_id, round_index, p1, p2, move1, move2, outcome, ts=None):
+        """Queue one round result; p1/p2 are names, moves may be None."""
+        data = RECORD.pack(match_id, round_index, player_id(p1), player_id(p2),
+                           MOVE_CODES.get(move1, NO_MOVE), MOVE_CODES.get(move2, NO_MOVE),
+                           OUTCOME_NAMES.index(outcome), ts if ts is not None else time.time())
+        with self.lock:
+            self.pending.append(data)
+            full = len(self.pending) >= self.batch_size
+        if full:
+            self.wake.set()
+
+    def flush_loop(self):
+        while self.running:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write and fsync everything queued as one group commit."""
+        with self.lock:
+            batch, self.pending = self.pending, []
+        if not batch:
+            return
+        with self.io_lock:
+            self.log.write(b"".join(batch))
+            self.log.flush()
+            os.fsync(self.log.fileno())
+            self.records += len(batch)
+            stale = self.records - self.by_match_index.covered >= self.reindex_every
+        if stale:
+            self.index_wake.set()
+
+    # Indexing ---------------------------------------------------------------
+    def index_loop(self):
+        while self.running:
+            self.index_wake.wait()
+            self.index_wake.clear()
+            if self.running:
+                self.reindex()
+
+    def reindex(self):
+        """Index the records written since the last run as a new run, then compact."""
+        # Runs are written outside io_lock so group commits and lookups carry
+        # on; only adding or swapping a run in the lists takes it
+        with self.reindex_lock:
+            with self.io_lock:
+                start, end = self.by_match_index.covered, self.records
+            if end == start:
+                return
+            new_match, new_player = [], []
+            with open(self.path, "rb") as f:
+                f.seek(start * RECORD.size)
+                data = f.read((end - start) * RECORD.size)
+            for n, fields in enumerate(RECORD.iter_unpack(data), start):
+                new_match.append((fields[0], n))
+                new_player.append((fields[2], n))
+                new_player.append((fields[3], n))
+            runs = [SortedIndex(index.write(self.sort_slices(entries), start, end))
+                    for index, entries in ((self.by_match_index, new_match), (self.by_player_index, new_player))]
+            with self.io_lock:
+                self.by_match_index.runs.append(runs[0])
+                self.by_player_index.runs.append(runs[1])
+            self.by_match_index.compact(self.io_lock)
+            self.by_player_index.compact(self.io_lock)
+
+    @staticmethod
+    def sort_slices(entries):
+        """entries in order; sorted a slice at a time so the flush thread keeps running."""
+        return heapq.merge(*(sorted(entries[i:i + SORT_SLICE]) for i in range(0, len(entries), SORT_SLICE)))
+
+    # Reading ----------------------------------------------------------------
+    def next_match_id(self):
+        """First match id not yet used in this log, so restarts never reuse one."""
+        with self.io_lock:
+            index = self.by_match_index
+            last = index.last_key()
+            with open(self.path, "rb") as f:
+                f.seek(index.covered * RECORD.size)
+                tail = f.read((self.records - index.covered) * RECORD.size)
+            for fields in RECORD.iter_unpack(tail):
+                last = max(last, fields[0])
+        return last + 1
+
+    def read_record(self, f, n):
+        f.seek(n * RECORD.size)
+        return self.decode(RECORD.unpack(f.read(RECORD.size)))
+
+    @staticmethod
+    def decode(fields):
+        match_id, round_index, p1, p2, m1, m2, outcome, ts = fields
+        return {"match": match_id, "round": round_index, "p1": p1, "p2": p2,
+                "move1": MOVES[m1] if m1 != NO_MOVE else None,
+                "move2": MOVES[m2] if m2 != NO_MOVE else None,
+                "outcome_p1": OUTCOME_NAMES[outcome], "time": ts}
+
+    def _query(self, index, key, matches):
+        with self.io_lock:
+            numbers = index.lookup(key)
+            covered, end = index.covered, self.records
+            with open(self.path, "rb") as f:
+                results = [self.read_record(f, n) for n in numbers]
+                if end > covered:
+                    f.seek(covered * RECORD.size)
+                    tail = f.read((end - covered) * RECORD.size)
+                    results.extend(self.decode(fields) for fields in RECORD.iter_unpack(tail)
+                                   if matches(fields))
+        return results
+
+    def by_match(self, match_id):
+        key = int(match_id)
+        return self._query(self.by_match_index, key, lambda fields: fields[0] == key)
+
+    def by_player(self, name):
+        key = player_id(name)
+        return self._query(self.by_player_index, key, lambda fields: key in (fields[2], fields[3]))
+
+    def close(self):
+        self.running = False
+        self.wake.set()
+        self.index_wake.set()
+        self.thread.join()
+        self.indexer.join()
+        self.flush()
+        self.reindex()
+        self.log.close()
+        self.by_match_index.close()
+        self.by_player_index.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[2] not in ("player", "match"):
+        print("usage: python history.py HISTORY_FILE player NAME | match ID")
+        sys.exit(2)
+    store = HistoryStore(sys.argv[1])
+    try:
+        rows = store.by_player(sys.argv[3]) if sys.argv[2] == "player" else store.by_match(sys.argv[3])
+        for row in rows:
+            print(json.dumps(row))
+    finally:
+        store.close()
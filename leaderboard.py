@@ -0,0 +1,190 @@
+import random, threading
+
+from matchmaking import DEFAULT_RATING
+
+# Global leaderboard -------------------------------------------------------------
+# Cumulative wins/losses/ties and rating per player, kept in rating order in
+# an indexable skip list: every link stores how many entries it jumps over,
+# so rank lookups, top-K and neighbours-around-rank all cost O(log n) and a
+# round result moves two players without ever re-sorting the board.
+
+MAX_LEVEL = 20   # 4**20 entries before the top level fills up
+P_LEVEL = 0.25
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level):
+        self.key = key
+        self.next = [None] * level
+        self.width = [1] * level  # entries skipped by next[i], counting the target
+
+class IndexedSkipList:
+    """Sorted keys with O(log n) insert, remove, rank and index access."""
+    def __init__(self, max_level=MAX_LEVEL):
+        self.max_level = max_level
+        self.head = _Node(None, max_level)
+        self.level = 1  # levels in use; searches skip the empty ones above
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _level(self):
+        level = 1
+        while level < self.max_level and random.random() < P_LEVEL:
+            level += 1
+        return level
+
+    def insert(self, key):
+        new = _Node(key, self._level())
+        while self.level < len(new.next):
+            self.head.width[self.level] = self.size + 1  # empty level: head links to the end
+            self.level += 1
+        chain = [self.head] * self.level
+        steps = [0] * self.level
+        node, pos = self.head, 0
+        for lvl in reversed(range(self.level)):
+            while node.next[lvl] is not None and node.next[lvl].key < key:
+                pos += node.width[lvl]
+                node = node.next[lvl]
+            chain[lvl], steps[lvl] = node, pos
+        for lvl in range(len(new.next)):
+            prev = chain[lvl]
+            dist = pos - steps[lvl]
+            new.next[lvl] = prev.next[lvl]
+            prev.next[lvl] = new
+            new.width[lvl] = prev.width[lvl] - dist
+            prev.width[lvl] = dist + 1
+        for lvl in range(len(new.next), self.level):
+            chain[lvl].width[lvl] += 1
+        self.size += 1
+
+    def remove(self, key):
+        chain = [None] * self.level
+        node = self.head
+        for lvl in reversed(range(self.level)):
+            while node.next[lvl] is not None and node.next[lvl].key < key:
+                node = node.next[lvl]
+            chain[lvl] = node
+        target = node.next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for lvl in range(len(target.next)):
+            prev = chain[lvl]
+            prev.width[lvl] += target.width[lvl] - 1
+            prev.next[lvl] = target.next[lvl]
+        for lvl in range(len(target.next), self.level):
+            chain[lvl].width[lvl] -= 1
+        self.size -= 1
+
+    def index(self, key):
+        """0-based position of key."""
+        node, pos = self.head, 0
+        for lvl in reversed(range(self.level)):
+            while node.next[lvl] is not None and node.next[lvl].key < key:
+                pos += node.width[lvl]
+                node = node.next[lvl]
+        target = node.next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        return pos
+
+    def slice(self, start, count):
+        """Up to count keys from 0-based position start, in order."""
+        if start >= self.size or count <= 0:
+            return []
+        node, pos = self.head, 0
+        for lvl in reversed(range(self.level)):
+            while node.next[lvl] is not None and pos + node.width[lvl] <= start + 1:
+                pos += node.width[lvl]
+                node = node.next[lvl]
+        keys = []
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+class PlayerRecord:
+    __slots__ = ("name", "wins", "losses", "ties", "rating")
+
+    def __init__(self, name, rating):
+        self.name = name
+        self.wins = self.losses = self.ties = 0
+        self.rating = rating
+
+    def key(self):
+        return (-self.rating, self.name)  # best rating first, name breaks ties
+
+    def to_dict(self, rank):
+        return {"rank": rank, "name": self.name, "rating": round(self.rating, 1),
+                "wins": self.wins, "losses": self.losses, "ties": self.ties}
+
+class Leaderboard:
+    def __init__(self, default_rating=DEFAULT_RATING):
+        self.default_rating = default_rating
+        self.lock = threading.Lock()
+        self.players = {}  # name -> PlayerRecord
+        self.order = IndexedSkipList()
+
+    def __len__(self):
+        return len(self.players)
+
+    def record(self, a, b, result_a, rating_a, rating_b):
+        """Apply one round: result_a is a's outcome, ratings are the new ones."""
+        result_b = "tie" if result_a == "tie" else "win" if result_a == "lose" else "lose"
+        with self.lock:
+            self._update(a, result_a, rating_a)
+            self._update(b, result_b, rating_b)
+
+    def _update(self, name, result, rating):
+        rec = self.players.get(name)
+        if rec is None:
+            rec = self.players[name] = PlayerRecord(name, rating)
+        else:
+            self.order.remove(rec.key())
+            rec.rating = rating
+        if result == "win":
+            rec.wins += 1
+        elif result == "lose":
+            rec.losses += 1
+        else:
+            rec.ties += 1
+        self.order.insert(rec.key())
+
+    def _rows(self, start, count):
+        return [self.players[name].to_dict(start + i + 1)
+                for i, (_, name) in enumerate(self.order.slice(start, count))]
+
+    def top(self, k=10):
+        with self.lock:
+            return self._rows(0, k)
+
+    def rank(self, name):
+        """1-based rank and stats for name, or None if they never played."""
+        with self.lock:
+            rec = self.players.get(name)
+            return rec.to_dict(self.order.index(rec.key()) + 1) if rec else None
+
+    def around(self, name, radius=5):
+        """The players ranked within radius places of name."""
+        with self.lock:
+            rec = self.players.get(name)
+            if rec is None:
+                return []
+            pos = self.order.index(rec.key())
+            start = max(0, pos - radius)
+            return self._rows(start, pos - start + radius + 1)
+
+    def command(self, action="top", *args):
+        """Control-socket entry point: leaderboard top [K] | rank NAME | around NAME [RADIUS]."""
+        try:
+            if action == "top":
+                return {"players": len(self), "top": self.top(int(args[0]) if args else 10)}
+            if action == "rank" and args:
+                return self.rank(args[0]) or {"error": f"no rounds recorded for {args[0]!r}"}
+            if action == "around" and args:
+                return {"around": self.around(args[0], int(args[1]) if len(args) > 1 else 5)}
+        except ValueError:
+            pass
+        return {"error": "usage: leaderboard top [K] | rank NAME | around NAME [RADIUS]"}
@@ -0,0 +1,149 @@
+import asyncio, argparse, json, random, time
+
+from codec import CODECS
+from gameserver import raise_nofile_limit
+from rpsclient import AsyncRpsClient, STRATEGIES
+
+# Headless bot swarm ----------------------------------------------------------
+# Opens N bot connections from one event loop, plays the join/move/quit
+# protocol and reports connect time, rounds/sec and move -> round_result
+# latency percentiles. --codec binary has the bots ask for the compact
+# binary wire format.
+
+def percentile(data, q):
+    if not data:
+        return 0.0
+    return data[min(len(data) - 1, int(q * len(data)))]
+
+class Swarm:
+    def __init__(self, host, port, bots, rounds, strategy, rate, connect_concurrency, prefix="bot",
+                 codec="json"):
+        self.host = host
+        self.port = port
+        self.bots = bots
+        self.rounds = rounds
+        self.strategy = STRATEGIES[strategy]
+        self.interval = bots / rate if rate else 0.0  # per-bot seconds between moves
+        self.connect_gate = asyncio.Semaphore(connect_concurrency)
+        self.prefix = prefix
+        self.codec = codec
+        self.sent_at = {}  # (name, round) -> send time, shared so a pair can use the later move
+        self.connect_times = []
+        self.latencies = []
+        self.errors = 0
+        self.failed = 0
+
+    async def run(self):
+        t0 = time.perf_counter()
+        await asyncio.gather(*(Bot(self, f"{self.prefix}{i}").run() for i in range(self.bots)))
+        return self.report(time.perf_counter() - t0)
+
+    def report(self, elapsed):
+        self.connect_times.sort()
+        self.latencies.sort()
+        ms = lambda data, q: round(percentile(data, q) * 1000, 3)
+        return {
+            "bots": self.bots,
+            "connected": len(self.connect_times),
+            "failed": self.failed,
+            "errors": self.errors,
+            "elapsed_s": round(elapsed, 3),
+            "rounds": len(self.latencies) // 2,  # both players see every round
+            "rounds_per_s": round(len(self.latencies) / 2 / elapsed, 1) if elapsed else 0.0,
+            "connect_ms": {q: ms(self.connect_times, v) for q, v in (("p50", .5), ("p95", .95), ("p99", .99))},
+            "latency_ms": {q: ms(self.latencies, v) for q, v in (("p50", .5), ("p95", .95), ("p99", .99))},
+        }
+
+class Bot:
+    def __init__(self, swarm, name):
+        self.swarm = swarm
+        self.name = name
+        self.client = AsyncRpsClient(name, swarm.host, swarm.port, swarm.codec, reconnect=False)
+        self.next_move_at = 0.0
+
+    async def run(self):
+        swarm, client = self.swarm, self.client
+        async with swarm.connect_gate:
+            t0 = time.perf_counter()
+            try:
+                await client.connect()
+                msg = await client.recv()
+            except OSError:
+                swarm.failed += 1
+                return
+            if not msg or msg.get("type") != "join_ack":
+                swarm.failed += 1
+                client.writer.close()
+                return
+            swarm.connect_times.append(time.perf_counter() - t0)
+        self.next_move_at = time.perf_counter() + random.random() * swarm.interval
+        try:
+            while client.rounds < swarm.rounds:
+                msg = await client.recv()
+                if msg is None:
+                    break
+                t = msg.get("type")
+                if t == "start_round":
+                    await self.play(msg["data"]["round"])
+                elif t == "round_result":
+                    self.on_result(msg["data"])
+                elif t == "error":
+                    swarm.errors += 1
+            await client.quit()
+        except ConnectionError:
+            swarm.failed += 1
+        finally:
+            client.writer.close()
+
+    async def play(self, round_index):
+        delay = self.next_move_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.next_move_at = max(self.next_move_at + self.swarm.interval, time.perf_counter())
+        self.swarm.sent_at[self.name, round_index] = time.perf_counter()
+        self.client.send_move(self.swarm.strategy(self.client))
+
+    def on_result(self, data):
+        now = time.perf_counter()
+        sent = self.swarm.sent_at
+        # Measure from the later of the two moves when both bots are ours
+        times = [sent.pop((p["name"], data["round"]), None) if p["name"] == self.name
+                 else sent.get((p["name"], data["round"])) for p in (data["p1"], data["p2"])]
+        times = [t for t in times if t is not None]
+        if times:
+            self.swarm.latencies.append(now - max(times))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless bot-swarm load generator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12345)
+    parser.add_argument("-n", "--bots", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20, help="rounds each bot plays before quitting")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="random")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="target moves/sec across all bots (0 = as fast as possible)")
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--prefix", default="bot", help="bot name prefix")
+    parser.add_argument("--codec", choices=sorted(CODECS), default="json", help="wire format to ask for")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    raise_nofile_limit()
+
+    async def run():
+        swarm = Swarm(args.host, args.port, args.bots, args.rounds, args.strategy, args.rate,
+                      args.connect_concurrency, args.prefix, args.codec)
+        return await swarm.run()
+
+    report = asyncio.run(run())
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(f"bots {report['connected']}/{report['bots']} connected, {report['failed']} failed, "
+          f"{report['errors']} server errors")
+    print(f"rounds {report['rounds']} in {report['elapsed_s']}s = {report['rounds_per_s']} rounds/s")
+    c, l = report["connect_ms"], report["latency_ms"]
+    print(f"connect ms  p50 {c['p50']}  p95 {c['p95']}  p99 {c['p99']}")
+    print(f"latency ms  p50 {l['p50']}  p95 {l['p95']}  p99 {l['p99']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import threading, itertools, time
+
+from matchmaking import Matchmaker
+from leaderboard import Leaderboard
+from outcomes import determine
+from metrics import REGISTRY
+from profiling import ProfiledLock
+
+# Rooms and matches ---------------------------------------------------
+# Every pair of joined players gets its own Match with its own lock, so
+# one server process runs any number of independent games.
+
+ROUND_DELAY = 0.5
+MAX_SPECTATORS = 1000  # per match
+
+ROUNDS = REGISTRY.counter("rps_rounds", "Rounds resolved; rate() gives rounds per second")
+MOVE_TO_RESULT = REGISTRY.histogram("rps_move_to_result_seconds",
+                                    "Time from a player's move to the round result")
+
+class Match:
+    def __init__(self, match_id, p1, p2, call_later, on_round=None, move_timeout=None):
+        self.id = match_id
+        self.players = [p1, p2]
+        self.spectators = []  # round_result subscribers
+        self.call_later = call_later
+        self.on_round = on_round
+        self.move_timeout = move_timeout
+        self.lock = ProfiledLock("lock:match")
+        self.round_index = 0
+        self.in_round = False
+        self.next_round = None  # pending timer handles, cancelled by end()
+        self.deadline = None
+        self.active = True
+        for p in self.players:
+            p.match = self
+            p.move = None
+            p.score = 0
+
+    def broadcast(self, obj, spectators=False):
+        """Encode obj once per codec and queue the same bytes for every recipient."""
+        mtype, frames = obj["type"], {}
+        recipients = self.players + self.spectators if spectators else self.players
+        for p in recipients:
+            if not p.active:
+                continue
+            try:
+                data = frames.get(p.codec)
+                if data is None:
+                    data = frames[p.codec] = p.codec.encode(obj)
+                p.send_bytes(mtype, data)
+            except Exception:
+                # Aborting wakes the player's reader, which runs the normal
+                # disconnect path outside of this lock
+                p.abort()
+
+    def watch(self, spectator):
+        """Subscribe a connection to round results; returns an error message or None."""
+        with self.lock:
+            if not self.active:
+                return "Match is over"
+            if len(self.spectators) >= MAX_SPECTATORS:
+                return "Too many spectators"
+            self.spectators.append(spectator)
+            spectator.watching = self
+        spectator.send({"type": "players", "data": {
+            "players": [p.name for p in self.players], "match": self.id, "round": self.round_index,
+            "scores": [p.score for p in self.players]}})
+        return None
+
+    def unwatch(self, spectator):
+        with self.lock:
+            if spectator in self.spectators:
+                self.spectators.remove(spectator)
+            spectator.watching = None
+
+    def start(self):
+        self.broadcast({"type": "players", "data": {"players": [p.name for p in self.players], "match": self.id}})
+        self.start_round()
+
+    def start_round(self):
+        with self.lock:
+            if not self.active:
+                return
+            for p in self.players:
+                p.move = None
+            self.round_index += 1
+            self.in_round = True
+            self.broadcast({
+                "type": "start_round",
+                "data": {
+                    "round": self.round_index,
+                    "message": f"Round {self.round_index} - choose your move"
+                }
+            })
+            if self.move_timeout:
+                self.deadline = self.call_later(self.move_timeout,
+                                                lambda r=self.round_index: self.expire_round(r))
+
+    def expire_round(self, round_index):
+        """Move deadline: a missing move loses the round."""
+        with self.lock:
+            if self.active and self.in_round and self.round_index == round_index:
+                self.evaluate_round()
+
+    def register_move(self, player, move):
+        """Record a move; returns an error message or None."""
+        with self.lock:
+            if not self.active:
+                return "Match is over"
+            if not self.in_round:
+                return "Round not started"
+            if player.move is not None:
+                return "Move already submitted"
+            player.move = move
+            player.move_at = time.perf_counter()
+            if all(p.move for p in self.players):
+                self.evaluate_round()
+        return None
+
+    def evaluate_round(self):
+        p1, p2 = self.players
+        m1, m2 = p1.move, p2.move
+        self.in_round = False
+        if self.deadline:
+            self.deadline.cancel()
+            self.deadline = None
+        if m1 and m2:
+            result1 = determine(m1, m2)
+        else:
+            result1 = "lose" if m2 else "win" if m1 else "tie"
+        # Update scores
+        if result1 == "win":
+            p1.score += 1
+            winner = p1.name
+        elif result1 == "lose":
+            p2.score += 1
+            winner = p2.name
+        else:
+            winner = None
+        result_packet = {
+            "type": "round_result",
+            "data": {
+                "round": self.round_index,
+                "winner": winner,
+                "p1": {"name": p1.name, "move": m1, "score": p1.score},
+                "p2": {"name": p2.name, "move": m2, "score": p2.score},
+                "outcome_p1": result1,
+                "outcome_p2": "tie" if result1 == "tie" else ("win" if result1 == "lose" else "lose")
+            }
+        }
+        self.broadcast(result_packet, spectators=True)
+        ROUNDS.inc()
+        now = time.perf_counter()
+        for p in self.players:
+            if p.move:
+                MOVE_TO_RESULT.observe(now - p.move_at)
+        # Start next round after short pause; scheduled first so a failure in
+        # the bookkeeping below cannot leave the match without a next round
+        self.next_round = self.call_later(ROUND_DELAY, self.start_round)
+        if self.on_round:
+            try:
+                self.on_round(self, result1)
+            except Exception as e:
+                print(f"[SERVER] Round bookkeeping failed in match {self.id}: {e!r}")
+
+    def replace(self, old, new):
+        """Hand a reconnected player's seat to their new connection; None if the match is over."""
+        with self.lock:
+            if not self.active:
+                return None
+            index = self.players.index(old)
+            self.players[index] = new
+            new.match = self
+            new.score, new.move, new.move_at = old.score, old.move, old.move_at
+            old.match = None
+            return index, self.in_round
+
+    def end(self, leaver):
+        """Stop the match; returns the player left behind, if still connected."""
+        with self.lock:
+            self.active = False
+            for timer in (self.next_round, self.deadline):
+                if timer:
+                    timer.cancel()
+            for p in self.players:
+                p.match = None
+            spectators, self.spectators = self.spectators, []
+        over, frames = {"type": "match_over", "data": {"match": self.id}}, {}
+        for s in spectators:
+            s.watching = None
+            data = frames.get(s.codec)
+            if data is None:
+                data = frames[s.codec] = s.codec.encode(over)
+            s.send_bytes("match_over", data)
+        other = self.players[1] if leaver is self.players[0] else self.players[0]
+        return other if other.active else None
+
+class RoomRegistry:
+    """Pairs joining players through the matchmaker and tracks live matches."""
+    def __init__(self, call_later, matchmaker=None, move_timeout=None, history=None):
+        self.call_later = call_later
+        self.move_timeout = move_timeout
+        self.matchmaker = matchmaker or Matchmaker()
+        self.history = history  # optional HistoryStore that keeps every round result
+        self.leaderboard = Leaderboard(self.matchmaker.ratings.default)
+        self.lock = threading.Lock()
+        self.matches = {}  # match id -> Match
+        self.rounds = 0
+        self._ids = itertools.count(history.next_match_id() if history else 1)
+
+    def join(self, player):
+        """Queue a player; returns the new Match if an opponent is in range."""
+        with self.lock:
+            opponent = self.matchmaker.add(player)
+            if opponent is None:
+                return None
+            return self._create(opponent, player)
+
+    def sweep(self):
+        """Widen waiting players' search windows; returns the new matches."""
+        with self.lock:
+            return [self._create(a, b) for a, b in self.matchmaker.sweep()]
+
+    def _create(self, p1, p2):
+        match = Match(next(self._ids), p1, p2, self.call_later, self.record_round, self.move_timeout)
+        self.matches[match.id] = match
+        return match
+
+    def record_round(self, match, result1):
+        p1, p2 = match.players
+        score = 1.0 if result1 == "win" else 0.0 if result1 == "lose" else 0.5
+        with self.lock:
+            self.rounds += 1
+            rating1, rating2 = self.matchmaker.ratings.record(p1.name, p2.name, score)
+        self.leaderboard.record(p1.name, p2.name, result1, rating1, rating2)
+        if self.history:
+            self.history.append(match.id, match.round_index, p1.name, p2.name, p1.move, p2.move, result1)
+
+    def leave(self, player):
+        """Drop a player; returns a survivor whose match just ended."""
+        match = player.match
+        if match is None:
+            with self.lock:
+                self.matchmaker.remove(player)
+            return None
+        with self.lock:
+            self.matches.pop(match.id, None)
+        return match.end(player)
+
+    def stats(self):
+        with self.lock:
+            return {"matches": len(self.matches), "waiting": len(self.matchmaker), "rounds": self.rounds,
+                    "queue_time": self.matchmaker.stats.snapshot()}
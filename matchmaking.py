@@ -0,0 +1,163 @@
+import time, bisect
+from collections import deque
+
+# Rating-based matchmaking ---------------------------------------------
+# Waiting players are indexed by rating bucket. The sorted list of
+# non-empty bucket keys lets a search jump straight to the buckets inside a
+# player's window with bisect, and the window widens the longer they wait.
+
+DEFAULT_RATING = 1500.0
+K_FACTOR = 32.0
+BUCKET_WIDTH = 50
+BASE_WINDOW = 100.0
+WINDOW_GROWTH = 50.0  # rating points added per second of waiting
+MAX_WINDOW = 1000.0
+
+def expected_score(ra, rb):
+    return 1.0 / (1.0 + 10 ** ((rb - ra) / 400.0))
+
+class RatingBook:
+    """Elo ratings keyed by player name."""
+    def __init__(self, default=DEFAULT_RATING, k=K_FACTOR):
+        self.default = default
+        self.k = k
+        self.ratings = {}
+
+    def get(self, name):
+        return self.ratings.get(name, self.default)
+
+    def record(self, a, b, score_a):
+        """Update both ratings; score_a is 1 for a win, 0.5 tie, 0 loss."""
+        ra, rb = self.get(a), self.get(b)
+        delta = self.k * (score_a - expected_score(ra, rb))
+        self.ratings[a] = ra + delta
+        self.ratings[b] = rb - delta
+        return self.ratings[a], self.ratings[b]
+
+class QueueStats:
+    """Rolling queue-time samples for the lobby."""
+    def __init__(self, window=2048):
+        self.samples = deque(maxlen=window)
+        self.matched = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.matched += 1
+
+    def snapshot(self):
+        data = sorted(self.samples)
+        if not data:
+            return {"matched": self.matched, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        pick = lambda q: data[min(len(data) - 1, int(q * len(data)))]
+        return {"matched": self.matched, "mean": sum(data) / len(data),
+                "p50": pick(0.50), "p95": pick(0.95), "max": data[-1]}
+
+class Ticket:
+    __slots__ = ("player", "rating", "key", "since")
+
+    def __init__(self, player, rating, key, since):
+        self.player = player
+        self.rating = rating
+        self.key = key
+        self.since = since
+
+class Matchmaker:
+    """Not thread-safe; RoomRegistry serialises access under its lock."""
+    def __init__(self, ratings=None, bucket_width=BUCKET_WIDTH, base_window=BASE_WINDOW,
+                 window_growth=WINDOW_GROWTH, max_window=MAX_WINDOW, clock=time.monotonic):
+        self.ratings = ratings or RatingBook()
+        self.bucket_width = bucket_width
+        self.base_window = base_window
+        self.window_growth = window_growth
+        self.max_window = max_window
+        self.clock = clock
+        self.buckets = {}  # bucket key -> {player: Ticket}, insertion ordered
+        self.keys = []     # sorted keys of non-empty buckets
+        self.tickets = {}  # player -> Ticket, oldest first
+        self.stats = QueueStats()
+
+    def __len__(self):
+        return len(self.tickets)
+
+    def window(self, ticket, now):
+        waited = now - ticket.since
+        return min(self.max_window, self.base_window + waited * self.window_growth)
+
+    def add(self, player):
+        """Queue a player; returns an opponent if one is already in range."""
+        now = self.clock()
+        rating = self.ratings.get(player.name)
+        ticket = Ticket(player, rating, int(rating // self.bucket_width), now)
+        opponent = self._find(ticket, self.base_window)
+        if opponent:
+            self._remove(opponent)
+            self.stats.add(0.0)
+            self.stats.add(now - opponent.since)
+            return opponent.player
+        self._insert(ticket)
+        return None
+
+    def remove(self, player):
+        ticket = self.tickets.get(player)
+        if ticket:
+            self._remove(ticket)
+
+    def sweep(self):
+        """Retry everyone with their widened window; returns new pairs."""
+        now = self.clock()
+        pairs = []
+        for ticket in list(self.tickets.values()):
+            if ticket.player not in self.tickets:
+                continue  # already paired during this sweep
+            if not ticket.player.active:
+                self._remove(ticket)
+                continue
+            opponent = self._find(ticket, self.window(ticket, now))
+            if opponent:
+                self._remove(ticket)
+                self._remove(opponent)
+                self.stats.add(now - ticket.since)
+                self.stats.add(now - opponent.since)
+                pairs.append((ticket.player, opponent.player))
+        return pairs
+
+    # Index maintenance ----------------------------------------------
+    def _insert(self, ticket):
+        bucket = self.buckets.get(ticket.key)
+        if bucket is None:
+            bucket = self.buckets[ticket.key] = {}
+            bisect.insort(self.keys, ticket.key)
+        bucket[ticket.player] = ticket
+        self.tickets[ticket.player] = ticket
+
+    def _remove(self, ticket):
+        self.tickets.pop(ticket.player, None)
+        bucket = self.buckets.get(ticket.key)
+        if bucket is None:
+            return
+        bucket.pop(ticket.player, None)
+        if not bucket:
+            del self.buckets[ticket.key]
+            del self.keys[bisect.bisect_left(self.keys, ticket.key)]
+
+    def _find(self, ticket, window):
+        """Closest-rated active waiting player within window, or None."""
+        lo = int((ticket.rating - window) // self.bucket_width)
+        hi = int((ticket.rating + window) // self.bucket_width)
+        keys = self.keys
+        # Walk outwards from the player's own bucket so nearer ratings win
+        right = bisect.bisect_left(keys, ticket.key)
+        left = right - 1
+        while (left >= 0 and keys[left] >= lo) or (right < len(keys) and keys[right] <= hi):
+            take_right = right < len(keys) and keys[right] <= hi and (
+                left < 0 or keys[left] < lo or keys[right] - ticket.key <= ticket.key - keys[left])
+            key = keys[right] if take_right else keys[left]
+            for other in self.buckets[key].values():
+                if other.player is not ticket.player and other.player.active \
+                        and abs(other.rating - ticket.rating) <= window:
+                    return other
+            if take_right:
+                right += 1
+            else:
+                left -= 1
+        return None
@@ -0,0 +1,225 @@
+import threading, bisect, time, weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Metrics registry ----------------------------------------------------------
+# Counters, gauges and histograms in the Prometheus text exposition format.
+# Updates go to a per-thread shard (a plain list owned by one thread), so
+# the hot path takes no lock; a scrape sums the shards. When a thread exits
+# its shard is folded into a base total, so per-connection threads do not
+# leave a shard behind each.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+class _ThreadToken:
+    """Lives in a thread's local storage; collected when the thread exits."""
+
+class _Sharded:
+    """Base for metrics whose updates land in per-thread cells."""
+    width = 1
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = {}  # id(cell) -> cell, one per live thread
+        self._base = [0] * self.width  # totals of threads that have exited
+        self._lock = threading.Lock()
+
+    def _cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0] * self.width
+            token = self._local.token = _ThreadToken()
+            with self._lock:
+                self._shards[id(cell)] = cell
+            weakref.finalize(token, self._retire, cell)
+            return cell
+
+    def _retire(self, cell):
+        with self._lock:
+            del self._shards[id(cell)]
+            for i, v in enumerate(cell):
+                self._base[i] += v
+
+    def _total(self):
+        with self._lock:
+            shards = list(self._shards.values())
+            total = list(self._base)
+        for cell in shards:
+            for i, v in enumerate(cell):
+                total[i] += v
+        return total
+
+class Counter(_Sharded):
+    def inc(self, amount=1):
+        try:
+            self._local.cell[0] += amount
+        except AttributeError:
+            self._cell()[0] += amount
+
+    def value(self):
+        return self._total()[0]
+
+    def samples(self, name, labels):
+        yield name + "_total" + labels, self.value()
+
+class Gauge(_Sharded):
+    """Sharded inc/dec gauge; set_function() makes it computed at scrape time."""
+    def __init__(self):
+        super().__init__()
+        self.fn = None
+
+    def inc(self, amount=1):
+        try:
+            self._local.cell[0] += amount
+        except AttributeError:
+            self._cell()[0] += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, fn):
+        self.fn = fn
+
+    def value(self):
+        return self.fn() if self.fn else self._total()[0]
+
+    def samples(self, name, labels):
+        yield name + labels, self.value()
+
+class Histogram(_Sharded):
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.width = len(self.bounds) + 2  # one count per bucket, +Inf, then the sum
+        super().__init__()
+
+    def observe(self, value):
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        cell[bisect.bisect_left(self.bounds, value)] += 1
+        cell[-1] += value
+
+    def time(self):
+        return _Timer(self)
+
+    def samples(self, name, labels):
+        total = self._total()
+        inner = labels[1:-1] + "," if labels else ""
+        running = 0
+        for bound, count in zip(self.bounds + (float("inf"),), total):
+            running += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield f'{name}_bucket{{{inner}le="{le}"}}', running
+        yield name + "_sum" + labels, total[-1]
+        yield name + "_count" + labels, running
+
+class _Timer:
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.t0)
+
+class Family:
+    """A named metric, optionally split by labels."""
+    def __init__(self, kind, name, help, labelnames, factory):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.factory = factory
+        self.children = {}
+        self._lock = threading.Lock()
+        self.default = None if self.labelnames else factory()
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(values, self.factory())
+        return child
+
+    def __getattr__(self, attr):
+        # Unlabelled families act as their single metric
+        default = self.__dict__.get("default")
+        if default is None:
+            raise AttributeError(attr)
+        return getattr(default, attr)
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        items = [((), self.default)] if self.default is not None else list(self.children.items())
+        for values, metric in items:
+            for sample, value in metric.samples(self.name, _format_labels(self.labelnames, values)):
+                lines.append(f"{sample} {value}")
+        return "\n".join(lines)
+
+class Registry:
+    def __init__(self):
+        self.families = {}
+        self.lock = threading.Lock()
+
+    def _register(self, kind, name, help, labelnames, factory):
+        with self.lock:
+            family = self.families.get(name)
+            if family is None:
+                family = self.families[name] = Family(kind, name, help, labelnames, factory)
+        return family
+
+    def counter(self, name, help, labelnames=()):
+        return self._register("counter", name, help, labelnames, Counter)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register("gauge", name, help, labelnames, Gauge)
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS, labelnames=()):
+        return self._register("histogram", name, help, labelnames, lambda: Histogram(buckets))
+
+    def expose(self):
+        with self.lock:
+            families = list(self.families.values())
+        return "\n".join(f.expose() for f in families) + "\n"
+
+REGISTRY = Registry()
+
+# HTTP endpoint ----------------------------------------------------------------
+class MetricsServer:
+    """Serves GET /metrics from a daemon thread."""
+    def __init__(self, port, host="127.0.0.1", registry=REGISTRY):
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry_ref.expose().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
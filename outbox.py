@@ -0,0 +1,81 @@
+import threading
+from collections import deque
+
+# Per-connection outbound queues --------------------------------------
+# Game code only ever appends encoded packets here, which never blocks; a
+# writer (thread or event-loop task) owns the socket and drains the queue.
+# When a consumer falls behind, the queue applies its slow-consumer policy.
+
+OUTBOX_SIZE = 64
+
+DROP = "drop"              # discard the new packet
+DISCONNECT = "disconnect"  # give up on the connection
+COALESCE = "coalesce"      # replace a queued packet of the same type, else disconnect
+POLICIES = (DROP, DISCONNECT, COALESCE)
+
+class Outbox:
+    def __init__(self, maxlen=OUTBOX_SIZE, policy=DISCONNECT, wakeup=None):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown slow-consumer policy {policy!r}")
+        self.maxlen = maxlen
+        self.policy = policy
+        self.wakeup = wakeup  # called after each put, for event-loop writers
+        self.items = deque()  # (message type, bytes)
+        self.cond = threading.Condition(threading.Lock())
+        self.closed = False
+        self.dropped = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def put(self, mtype, data):
+        """Queue a packet; False means the consumer is too slow and must go."""
+        with self.cond:
+            if self.closed:
+                return True
+            if len(self.items) >= self.maxlen:
+                if self.policy == DROP:
+                    self.dropped += 1
+                    return True
+                if self.policy == DISCONNECT or not self._coalesce(mtype, data):
+                    return False
+            else:
+                self.items.append((mtype, data))
+            self.cond.notify()
+        if self.wakeup:
+            self.wakeup()
+        return True
+
+    def _coalesce(self, mtype, data):
+        for i in range(len(self.items) - 1, -1, -1):
+            if self.items[i][0] == mtype:
+                del self.items[i]
+                self.items.append((mtype, data))
+                self.coalesced += 1
+                return True
+        return False
+
+    def drain(self):
+        """Take everything queued without waiting."""
+        with self.cond:
+            batch = [data for _, data in self.items]
+            self.items.clear()
+        return batch
+
+    def get_batch(self, timeout=None):
+        """Wait for packets; returns None once closed and empty."""
+        with self.cond:
+            while not self.items and not self.closed:
+                if not self.cond.wait(timeout):
+                    return []
+            batch = [data for _, data in self.items]
+            self.items.clear()
+        return batch or None
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        if self.wakeup:
+            self.wakeup()
@@ -0,0 +1,66 @@
+import random, time, sys
+
+try:
+    import numpy as np
+except ImportError:  # the scalar path below covers everything numpy does
+    np = None
+
+# Outcome engine ---------------------------------------------------------------
+# Moves are small integer codes and results come from a precomputed table,
+# so resolving a round is one lookup. resolve_batch() resolves many rounds at
+# once, in a single numpy indexing operation when numpy is installed.
+
+MOVES = ("rock", "paper", "scissors")
+MOVE_CODES = {m: i for i, m in enumerate(MOVES)}
+
+TIE, WIN, LOSE = 0, 1, 2
+OUTCOME_NAMES = ("tie", "win", "lose")
+
+def outcome_table(n=len(MOVES)):
+    """n x n table of results for the row player; n must be odd.
+
+    Move a beats move b when (a - b) % n is odd, which for n = 3 gives
+    rock < paper < scissors < rock and extends to balanced variants.
+    """
+    if n % 2 == 0:
+        raise ValueError("a balanced game needs an odd number of moves")
+    return tuple(tuple(TIE if a == b else WIN if (a - b) % n % 2 else LOSE for b in range(n))
+                 for a in range(n))
+
+OUTCOME = outcome_table()
+_BY_NAME = {(MOVES[a], MOVES[b]): OUTCOME_NAMES[OUTCOME[a][b]]
+            for a in range(len(MOVES)) for b in range(len(MOVES))}
+_TABLE_NP = np.array(OUTCOME, dtype=np.int8) if np is not None else None
+
+def resolve(a, b):
+    """Result code for move code a against move code b."""
+    return OUTCOME[a][b]
+
+def determine(a, b):
+    """'win', 'lose' or 'tie' for move name a against move name b."""
+    return _BY_NAME[a, b]
+
+def resolve_batch(a_codes, b_codes):
+    """Result codes for many rounds; a numpy int8 array, or a list without numpy."""
+    if _TABLE_NP is not None:
+        return _TABLE_NP[np.asarray(a_codes, dtype=np.intp), np.asarray(b_codes, dtype=np.intp)]
+    return [OUTCOME[a][b] for a, b in zip(a_codes, b_codes)]
+
+# Offline simulation ----------------------------------------------------------
+def simulate(rounds, seed=None):
+    """Resolve random rounds; returns (ties, wins, losses) for player one."""
+    rng = random.Random(seed)
+    a = [rng.randrange(len(MOVES)) for _ in range(rounds)]
+    b = [rng.randrange(len(MOVES)) for _ in range(rounds)]
+    results = resolve_batch(a, b)
+    if _TABLE_NP is not None:
+        return tuple(int(c) for c in np.bincount(results, minlength=3))
+    return results.count(TIE), results.count(WIN), results.count(LOSE)
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    t0 = time.perf_counter()
+    ties, wins, losses = simulate(rounds, seed=1)
+    elapsed = time.perf_counter() - t0
+    engine = "numpy" if np is not None else "scalar"
+    print(f"{rounds} rounds ({engine}): ties={ties} wins={wins} losses={losses} in {elapsed:.3f}s")
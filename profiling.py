@@ -0,0 +1,117 @@
+import threading, time, signal, json
+
+# Message handler profiling -----------------------------------------------------
+# Per-message-type call counts, cumulative and max handler time, plus time
+# spent waiting for locks. Off by default; call sites test PROFILER.enabled
+# first, so the disabled cost is one attribute lookup. Toggle at runtime
+# with SIGUSR1 (SIGUSR2 prints a report) or the control socket.
+
+class HandlerProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.stats = {}  # key -> [calls, total seconds, max seconds]
+        self.since = time.time()
+
+    def record(self, key, seconds):
+        with self.lock:
+            entry = self.stats.get(key)
+            if entry is None:
+                self.stats[key] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+
+    def call(self, key, fn, *args):
+        """Run fn(*args), timing it under key when profiling is on."""
+        if not self.enabled:
+            return fn(*args)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.record(key, time.perf_counter() - t0)
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        return self.snapshot()
+
+    def toggle(self):
+        return self.set_enabled(not self.enabled)
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+            self.since = time.time()
+        return self.snapshot()
+
+    def snapshot(self):
+        with self.lock:
+            items = sorted(self.stats.items(), key=lambda kv: -kv[1][1])
+            return {
+                "enabled": self.enabled,
+                "seconds": round(time.time() - self.since, 3),
+                "handlers": {key: {"calls": calls, "total_ms": round(total * 1000, 3),
+                                   "mean_us": round(total / calls * 1e6, 2), "max_ms": round(peak * 1000, 3)}
+                             for key, (calls, total, peak) in items},
+            }
+
+    def command(self, action="dump"):
+        """Control-socket entry point: profile on|off|toggle|reset|dump."""
+        actions = {"on": lambda: self.set_enabled(True), "off": lambda: self.set_enabled(False),
+                   "toggle": self.toggle, "reset": self.reset, "dump": self.snapshot}
+        if action not in actions:
+            return {"error": f"unknown profile action {action!r}", "actions": sorted(actions)}
+        return actions[action]()
+
+    def install_signals(self, tag="[PROFILE]"):
+        """SIGUSR1 toggles profiling, SIGUSR2 prints a report; main thread only."""
+        if not hasattr(signal, "SIGUSR1"):  # not on Windows
+            return
+
+        # Handlers run on the main thread between bytecodes, possibly inside
+        # record() holding self.lock (the asyncio engine runs everything
+        # there), so they only flip the flag and leave locking and printing
+        # to a short-lived thread
+        def later(fn):
+            threading.Thread(target=fn, daemon=True).start()
+
+        def on_toggle(signum, frame):
+            self.enabled = not self.enabled
+            state = "enabled" if self.enabled else "disabled"
+            later(lambda: print(f"{tag} {state}"))
+
+        def on_dump(signum, frame):
+            later(lambda: print(f"{tag} {json.dumps(self.snapshot(), indent=2)}"))
+
+        signal.signal(signal.SIGUSR1, on_toggle)
+        signal.signal(signal.SIGUSR2, on_dump)
+
+PROFILER = HandlerProfiler()
+
+class ProfiledLock:
+    """A Lock that reports acquisition wait time while profiling is on."""
+    def __init__(self, key, profiler=PROFILER):
+        self.key = key
+        self.profiler = profiler
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        if not self.profiler.enabled:
+            self._lock.acquire()
+            return self
+        t0 = time.perf_counter()
+        self._lock.acquire()
+        self.profiler.record(self.key, time.perf_counter() - t0)
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+    def acquire(self, blocking=True, timeout=-1):
+        return self._lock.acquire(blocking, timeout)
+
+    def release(self):
+        self._lock.release()
@@ -0,0 +1,92 @@
+import threading, time
+
+# Flood protection ------------------------------------------------------------------
+# Token buckets per connection and per source address, checked on each raw
+# frame before it is JSON-decoded, so an over-limit message costs one
+# bucket update and is dropped unparsed. Error replies have their own small
+# bucket, so a flood of bad messages cannot turn into a flood of replies. A
+# connection that keeps sending after STRIKES consecutive drops is closed.
+
+MESSAGE_RATE = 20.0    # messages/s per connection; bursts of twice that
+IP_RATE = 0.0          # messages/s summed over one address's connections; off by default
+                       # since NAT gateways and loadgen.py put many players behind one address
+ERROR_RATE = 1.0       # error replies/s per connection
+ERROR_BURST = 5
+STRIKES = 100
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "stamp", "clock")
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.clock = clock
+        self.stamp = clock()
+
+    def take(self, cost=1.0):
+        now = self.clock()
+        tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if tokens < cost:
+            self.tokens = tokens
+            return False
+        self.tokens = tokens - cost
+        return True
+
+class FloodGuard:
+    """One connection's view of the limits."""
+    __slots__ = ("bucket", "ip_bucket", "errors", "strikes", "dropped", "on_flood")
+
+    def __init__(self, bucket, ip_bucket, errors, on_flood):
+        self.bucket = bucket
+        self.ip_bucket = ip_bucket
+        self.errors = errors
+        self.strikes = 0
+        self.dropped = 0
+        self.on_flood = on_flood
+
+    def allow(self):
+        """Whether the next frame may be decoded; False means drop it."""
+        if (self.bucket is None or self.bucket.take()) and (self.ip_bucket is None or self.ip_bucket.take()):
+            self.strikes = 0
+            return True
+        self.dropped += 1
+        self.strikes += 1
+        if self.strikes == STRIKES:
+            self.on_flood()
+        return False
+
+    def may_reply_error(self):
+        return self.errors.take()
+
+class RateLimiter:
+    def __init__(self, rate=MESSAGE_RATE, ip_rate=IP_RATE, clock=time.monotonic):
+        self.rate = rate
+        self.ip_rate = ip_rate
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.ips = {}  # address -> [TokenBucket, open connections]
+
+    def guard(self, ip, on_flood):
+        """A FloodGuard for a new connection from ip; release(ip) when it closes."""
+        ip_bucket = None
+        if self.ip_rate:
+            with self.lock:
+                entry = self.ips.get(ip)
+                if entry is None:
+                    entry = self.ips[ip] = [TokenBucket(self.ip_rate, 2 * self.ip_rate, self.clock), 0]
+                entry[1] += 1
+                ip_bucket = entry[0]
+        bucket = TokenBucket(self.rate, 2 * self.rate, self.clock) if self.rate else None
+        return FloodGuard(bucket, ip_bucket, TokenBucket(ERROR_RATE, ERROR_BURST, self.clock), on_flood)
+
+    def release(self, ip):
+        if not self.ip_rate:
+            return
+        with self.lock:
+            entry = self.ips.get(ip)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self.ips[ip]
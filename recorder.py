@@ -0,0 +1,114 @@
+import struct, threading, time, itertools, gzip
+
+# Session recording -------------------------------------------------------------
+# Every protocol event is appended as a fixed header (seconds since the
+# recording started, connection id, event kind, payload length) followed by
+# the payload: the peer address for CONNECT, the JSON line for IN and OUT.
+# TIMER marks a timer callback running and carries the timer's sequence
+# number (in scheduling order) where the connection id goes. The server
+# logs each event while holding its ordering lock, so the log order is the
+# order the effects happened in. Events are only buffered under the lock;
+# a writer thread does the file writes and, for a path ending in .gz, the
+# gzip compression. replay.py feeds a recording back through the server
+# logic.
+
+MAGIC = b"RPSREC1\n"
+EVENT = struct.Struct("<dIBI")  # time, connection id (timer number for TIMER), kind, payload length
+CONNECT, INBOUND, OUTBOUND, CLOSE, TIMER = range(5)
+FLUSH_INTERVAL = 1.0  # seconds; bounds what a crash can lose
+WRITE_BATCH = 1 << 20  # buffered bytes that wake the writer early
+KIND_NAMES = ("connect", "in", "out", "close", "timer")
+
+def _open(path, mode):
+    return gzip.open(path, mode, compresslevel=6) if path.endswith(".gz") else open(path, mode)
+
+class SessionRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.file = _open(path, "wb")
+        self.file.write(MAGIC)
+        self.lock = threading.Lock()
+        self.t0 = time.monotonic()
+        self.ids = itertools.count(1)
+        self.timer_ids = itertools.count(1)
+        self.events = 0
+        self.buf = []
+        self.buffered = 0
+        self.running = True
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+    def write(self, kind, conn_id, payload=b""):
+        with self.lock:
+            if not self.running:
+                return
+            self.buf.append(EVENT.pack(time.monotonic() - self.t0, conn_id, kind, len(payload)))
+            self.buf.append(payload)
+            self.events += 1
+            self.buffered += EVENT.size + len(payload)
+            full = self.buffered >= WRITE_BATCH
+        if full:
+            self.wake.set()
+
+    def write_loop(self):
+        while True:
+            self.wake.wait(FLUSH_INTERVAL)
+            self.wake.clear()
+            with self.lock:
+                chunks, self.buf, self.buffered = self.buf, [], 0
+                running = self.running
+            if chunks:
+                self.file.write(b"".join(chunks))
+                self.file.flush()
+            if not running:
+                return
+
+    def attach(self, player):
+        """Give a new connection its recording id and log the connect."""
+        player.recorder = self
+        player.rec_id = next(self.ids)
+        self.write(CONNECT, player.rec_id, str(player.addr).encode("utf-8"))
+
+    def inbound(self, player, data):
+        self.write(INBOUND, player.rec_id, data)
+
+    def outbound(self, player, data):
+        self.write(OUTBOUND, player.rec_id, data)
+
+    def closed(self, player):
+        self.write(CLOSE, player.rec_id)
+
+    def next_timer(self):
+        """Sequence number for a newly scheduled timer."""
+        return next(self.timer_ids)
+
+    def timer(self, timer_id):
+        self.write(TIMER, timer_id)
+
+    def close(self):
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+        self.wake.set()
+        self.thread.join()
+        self.file.close()
+
+def read_events(path):
+    """Yield (time, conn_id, kind, payload) from a recording."""
+    with _open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        try:
+            while True:
+                header = f.read(EVENT.size)
+                if len(header) < EVENT.size:
+                    return
+                t, conn_id, kind, size = EVENT.unpack(header)
+                payload = f.read(size)
+                if len(payload) < size:
+                    return
+                yield t, conn_id, kind, payload
+        except EOFError:
+            return  # gzip stream cut short: the server died mid-recording
@@ -0,0 +1,230 @@
+import argparse, contextlib, io, json, sys, time, heapq, itertools
+from collections import defaultdict
+
+from gameserver import PlayerConn, RpsServer, RESUME_GRACE
+from matches import RoomRegistry
+from matchmaking import Matchmaker
+from recorder import read_events, CONNECT, INBOUND, OUTBOUND, CLOSE, TIMER
+from heartbeat import IDLE_TIMEOUT
+
+# Session replay -----------------------------------------------------------------
+# python replay.py session.rec [--speed 10] [--move-timeout 5]
+# Feeds a recording from gameserver.py --record back through the server's
+# protocol logic with fake connections and a virtual clock, at a multiple
+# of real time or as fast as possible (--speed 0). Round delays, move
+# deadlines and lobby sweeps fire where the recording logged them running,
+# or on the virtual clock for recordings without timer events and for what
+# is still pending at the end. Each connection's replies are compared with
+# the recorded ones.
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class ReplayTimer:
+    __slots__ = ("due", "fn", "cancelled", "id", "registry")
+
+    def __init__(self, due, fn, timer_id=0, registry=None):
+        self.due = due
+        self.fn = fn
+        self.cancelled = False
+        self.id = timer_id
+        self.registry = registry  # ReplayServer.scheduled while timers fire from the log
+
+    def cancel(self):
+        self.cancelled = True
+        if self.registry is not None:
+            self.registry.pop(self.id, None)
+
+class ReplaySocket:
+    def sendall(self, data):
+        pass
+
+    def shutdown(self, how):
+        pass
+
+    def close(self):
+        pass
+
+class ReplayServer(RpsServer):
+    """RpsServer driven by recorded events instead of sockets and wall time."""
+    def __init__(self, move_timeout=None, resume_tokens=None, idle_timeout=IDLE_TIMEOUT, logged_timers=False,
+                 resume_grace=RESUME_GRACE):
+        super().__init__(move_timeout=move_timeout, idle_timeout=idle_timeout, resume_grace=resume_grace)
+        self.resume_tokens = resume_tokens or {}  # recorded connection id -> token it was given
+        self.clock = VirtualClock()
+        if self.idle:
+            self.idle.clock = self.clock
+        self.pending = []  # heap of (due, seq, ReplayTimer) on the virtual clock
+        self.seq = itertools.count()
+        self.logged_timers = logged_timers
+        self.timer_ids = itertools.count(1)  # numbered like the recorder numbers them
+        self.scheduled = {}  # timer id -> ReplayTimer waiting for its TIMER event
+        self.rooms = RoomRegistry(self.call_later, Matchmaker(clock=self.clock), move_timeout=move_timeout)
+        self.conns = {}  # recorded connection id -> PlayerConn
+        self.produced = defaultdict(list)
+
+    def new_resume_token(self, player):
+        # Reissue the recorded token so a later resume in the log still matches
+        return self.resume_tokens.get(player.rec_id) or super().new_resume_token(player)
+
+    def call_later(self, delay, fn):
+        # Exact virtual deadlines rather than wheel ticks, so a timer fires
+        # before any event recorded after it
+        timer = ReplayTimer(self.clock.now + delay, fn, next(self.timer_ids))
+        if self.logged_timers:
+            timer.registry = self.scheduled
+            self.scheduled[timer.id] = timer
+        else:
+            heapq.heappush(self.pending, (timer.due, next(self.seq), timer))
+        return timer
+
+    def fire(self, timer_id):
+        """Run the timer the recorded server ran at this point."""
+        timer = self.scheduled.pop(timer_id, None)
+        if timer is not None:
+            timer.fn()
+
+    def finish(self, t):
+        """Fire whatever is still scheduled, on the virtual clock up to t."""
+        for timer in self.scheduled.values():
+            timer.registry = None
+            heapq.heappush(self.pending, (timer.due, next(self.seq), timer))
+        self.scheduled.clear()
+        self.logged_timers = False
+        self.advance_to(t)
+
+    def advance_to(self, t):
+        """Move the virtual clock to t, firing due timers in order on the way."""
+        while self.pending and self.pending[0][0] <= t:
+            due, _, timer = heapq.heappop(self.pending)
+            if timer.cancelled:
+                continue
+            self.clock.now = max(self.clock.now, due)
+            timer.fn()
+            self.collect()
+        self.clock.now = max(self.clock.now, t)
+
+    def apply(self, conn_id, kind, payload):
+        if kind == CONNECT:
+            player = self.conns[conn_id] = PlayerConn(ReplaySocket(), payload.decode("utf-8"),
+                                                      self.outbox_size, self.slow_policy)
+            player.rec_id = conn_id
+            if self.idle:
+                self.idle.touch(player)
+            return
+        player = self.conns.get(conn_id)
+        if player is None or not player.active:
+            return
+        if kind == CLOSE:
+            self.disconnect(player)
+        elif kind == INBOUND:
+            msg = json.loads(payload)
+            if player.name is None:
+                if not self.admit(player, msg):
+                    player.active = False
+                    player.close()
+            elif not self.handle_message(player, msg):
+                self.disconnect(player, "quit")
+
+    def collect(self):
+        # Stand-in for the writer threads: take whatever each connection queued
+        for conn_id, player in self.conns.items():
+            if player.outbox.items:
+                self.produced[conn_id].extend(player.outbox.drain())
+
+def scan_recording(path):
+    """Resume tokens the recorded server handed out, by connection, and
+    whether the recording logs timer firings."""
+    tokens, timers = {}, False
+    for _, conn_id, kind, payload in read_events(path):
+        if kind == OUTBOUND and payload.startswith(b'{"type":"join_ack"'):
+            token = json.loads(payload)["data"].get("resume_token")
+            if token:
+                tokens[conn_id] = token
+        elif kind == TIMER:
+            timers = True
+    return tokens, timers
+
+def replay(path, speed=0.0, move_timeout=None, idle_timeout=IDLE_TIMEOUT, resume_grace=RESUME_GRACE):
+    tokens, logged_timers = scan_recording(path)
+    server = ReplayServer(move_timeout, tokens, idle_timeout, logged_timers, resume_grace)
+    recorded = defaultdict(list)
+    counts = defaultdict(int)
+    server.sweep_lobby()
+    server.reap_idle()
+    t0 = time.perf_counter()
+    for t, conn_id, kind, payload in read_events(path):
+        counts[kind] += 1
+        if kind == OUTBOUND:
+            recorded[conn_id].append(payload)
+            continue
+        if speed:
+            delay = t / speed - (time.perf_counter() - t0)
+            if delay > 0:
+                time.sleep(delay)
+        server.advance_to(t)
+        if kind == TIMER:
+            server.fire(conn_id)
+        else:
+            server.apply(conn_id, kind, payload)
+        server.collect()
+    # Let the last round results and deadlines play out
+    server.finish(server.clock.now + 2.0 + (move_timeout or 0.0))
+    elapsed = time.perf_counter() - t0
+    diverged = sorted(c for c in set(recorded) | set(server.produced)
+                      if server.produced.get(c, []) != recorded.get(c, []))
+    replayed = counts[CONNECT] + counts[INBOUND] + counts[CLOSE] + counts[TIMER]
+    return {
+        "connections": counts[CONNECT],
+        "inbound": counts[INBOUND],
+        "outbound_recorded": counts[OUTBOUND],
+        "outbound_replayed": sum(len(v) for v in server.produced.values()),
+        "rounds": server.rooms.rounds,
+        "virtual_s": round(server.clock.now, 3),
+        "elapsed_s": round(elapsed, 3),
+        "events_per_s": round(replayed / elapsed, 1) if elapsed else 0.0,
+        "diverged": diverged,
+    }, server, recorded
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded server session")
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="multiple of real time (0 = as fast as possible)")
+    parser.add_argument("--move-timeout", type=float, default=None,
+                        help="the --move-timeout the recorded server ran with")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="the --idle-timeout the recorded server ran with")
+    parser.add_argument("--resume-grace", type=float, default=RESUME_GRACE,
+                        help="the --resume-grace the recorded server ran with")
+    parser.add_argument("--verbose", action="store_true", help="show server log output and divergences")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    out = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with out:
+        report, server, recorded = replay(args.recording, args.speed, args.move_timeout, args.idle_timeout,
+                                           args.resume_grace)
+    if args.verbose:
+        for conn_id in report["diverged"][:5]:
+            got, want = server.produced.get(conn_id, []), recorded.get(conn_id, [])
+            first = next((i for i, (a, b) in enumerate(zip(got, want)) if a != b), min(len(got), len(want)))
+            print(f"connection {conn_id} diverges at packet {first}:")
+            print(f"  recorded {want[first] if first < len(want) else None!r}")
+            print(f"  replayed {got[first] if first < len(got) else None!r}")
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(f"{report['connections']} connections, {report['inbound']} inbound events, "
+              f"{report['rounds']} rounds over {report['virtual_s']}s of recorded time")
+        print(f"replayed in {report['elapsed_s']}s = {report['events_per_s']} events/s")
+        print(f"outbound packets: {report['outbound_recorded']} recorded, {report['outbound_replayed']} replayed, "
+              f"{len(report['diverged'])} connections diverged")
+    sys.exit(1 if report["diverged"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import tkinter as tk
+
+# Round result overlay ---------------------------------------------------------
+# One panel per window, built once and updated in place every round instead
+# of opening a Toplevel per result. Normally it slides up over the board,
+# holds for RESULT_HOLD_MS and slides away; in turbo mode it is docked at
+# the bottom edge and only its text changes, so a round costs three label
+# updates and no timers.
+
+RESULT_HOLD_MS = 2500
+SLIDE_STEPS = 8
+SLIDE_MS = 15
+TITLES = {"win": "Win ✅", "tie": "Tie 🤝", "lose": "Lose ❌"}
+COLORS = {"win": "#27ae60", "tie": "#f39c12", "lose": "#e74c3c"}
+
+class ResultPanel:
+    def __init__(self, parent, turbo=False, bg="#1a1a2e", hold_ms=RESULT_HOLD_MS):
+        self.parent = parent
+        self.turbo = turbo
+        self.hold_ms = hold_ms
+        self.frame = tk.Frame(parent, bg=bg, highlightthickness=2, highlightbackground="#4a90e2")
+        self.title = tk.Label(self.frame, font=("Arial", 20, "bold"), bg=bg)
+        self.title.pack(pady=(12, 4))
+        self.detail = tk.Label(self.frame, fg="white", bg=bg, font=("Arial", 14))
+        self.detail.pack(pady=4)
+        self.score = tk.Label(self.frame, fg="#aaaaaa", bg=bg)
+        self.score.pack(pady=(4, 12))
+        for w in (self.frame, self.title, self.detail, self.score):
+            w.bind("<Button-1>", lambda e: self.hide())  # click to dismiss early
+        self.job = None  # pending after() id for the slide or the hold
+        self.step = 0
+
+    def show(self, outcome, detail, score):
+        """outcome is "win", "lose" or "tie"; detail and score are display text."""
+        self.title.config(text=TITLES[outcome], fg=COLORS[outcome])
+        self.detail.config(text=detail)
+        self.score.config(text=score)
+        self.cancel()
+        self.frame.lift()
+        if self.turbo:
+            self.frame.place(relx=0.5, rely=1.0, anchor="s", relwidth=0.6)
+            return
+        self.step = 0
+        self.slide()
+
+    def slide(self):
+        self.step += 1
+        self.frame.place(relx=0.5, rely=1.0 - 0.5 * self.step / SLIDE_STEPS, anchor="center", relwidth=0.6)
+        if self.step < SLIDE_STEPS:
+            self.job = self.parent.after(SLIDE_MS, self.slide)
+        else:
+            self.job = self.parent.after(self.hold_ms, self.hide)
+
+    def set_turbo(self, on):
+        self.turbo = on
+        self.hide()
+
+    def hide(self):
+        self.cancel()
+        self.frame.place_forget()
+
+    def cancel(self):
+        if self.job is not None:
+            self.parent.after_cancel(self.job)
+            self.job = None
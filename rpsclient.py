@@ -0,0 +1,380 @@
+import argparse, asyncio, random, socket, sys, threading, time
+
+from framing import FrameTooLarge, CHUNK_SIZE
+from codec import JSON_LINES, CODECS, negotiate
+from outcomes import MOVES, MOVE_CODES
+
+# Headless client ------------------------------------------------------------------
+# The join/move/quit protocol without any UI. RpsClient runs a listener
+# thread and calls the handlers registered with on(); AsyncRpsClient is the
+# asyncio version and yields messages from async for. Both answer pings,
+# switch to the codec named in join_ack and, once they hold a resume token,
+# reconnect into the same match after a dropped connection. gameclient.py
+# draws on RpsClient, loadgen.py drives AsyncRpsClient, and
+# python rpsclient.py plays from a terminal or as a bot.
+
+HOST = "localhost"
+PORT = 12345
+RECONNECT_DELAY = 0.5  # first retry; doubles up to RECONNECT_MAX_DELAY
+RECONNECT_MAX_DELAY = 4.0
+
+def counter_move(move):
+    """The move that beats move."""
+    return MOVES[(MOVE_CODES[move] + 1) % len(MOVES)]
+
+# Bot strategies: each picks a move from a client's game state
+STRATEGIES = {
+    "random": lambda client: random.choice(MOVES),
+    "rock": lambda client: "rock",
+    "cycle": lambda client: MOVES[client.rounds % len(MOVES)],
+    "counter": lambda client: counter_move(client.opponent_last) if client.opponent_last else random.choice(MOVES),
+}
+
+class ClientProtocol:
+    """Game state and the protocol rules both clients share."""
+    def __init__(self, name, codec="json"):
+        self.name = name
+        self.wanted_codec = codec
+        self.codec = JSON_LINES
+        self.framer = None
+        self.resume_token = None  # from join_ack; lets a dropped connection rejoin its match
+        self.resume_grace = 0.0
+        self.quitting = False
+        self.players = []
+        self.opponent = None
+        self.round = 0
+        self.in_round = False
+        self.rounds = 0  # results seen
+        self.opponent_last = None
+        self.last_result = None
+
+    def join_message(self):
+        join = {"name": self.name, "codec": self.wanted_codec}
+        if self.resume_token:
+            join["resume_token"] = self.resume_token
+        return {"type": "join", "data": join}
+
+    def new_framer(self, sock=None):
+        self.codec = JSON_LINES  # join and join_ack are always JSON lines
+        self.framer = JSON_LINES.framer(sock)
+
+    def use_codec(self, codec):
+        """Switch to the codec the server acknowledged, keeping buffered bytes."""
+        if codec is self.codec:
+            return
+        leftover = self.framer.leftover()
+        self.framer = codec.framer(self.framer.sock)
+        self.framer.feed(leftover)
+        self.codec = codec
+
+    def absorb(self, msg):
+        """Update game state from one server message; returns the reply to send, if any."""
+        t = msg.get("type")
+        data = msg.get("data") or {}
+        if t == "join_ack":
+            self.use_codec(negotiate(data.get("codec")))
+            self.resume_token = data.get("resume_token")
+            self.resume_grace = data.get("resume_grace", 0.0)
+            if data.get("resumed"):
+                self.round = data.get("round", self.round)
+        elif t == "players":
+            self.players = data.get("players", [])
+            opp = [p for p in self.players if p != self.name]
+            self.opponent = opp[0] if opp else None
+        elif t == "start_round":
+            self.round = data.get("round", self.round)
+            self.in_round = True
+        elif t == "round_result":
+            self.in_round = False
+            self.rounds += 1
+            self.last_result = data
+            opponent = data["p2"] if data["p1"]["name"] == self.name else data["p1"]
+            self.opponent_last = opponent["move"]
+        elif t == "opponent_left":
+            self.opponent = None
+            self.in_round = False
+        elif t == "ping":
+            return {"type": "pong"}
+        return None
+
+    def outcome(self, data):
+        """"win", "lose" or "tie" for this client in a round_result."""
+        if data["winner"] is None:
+            return "tie"
+        return "win" if data["winner"] == self.name else "lose"
+
+# Threaded client -------------------------------------------------
+class RpsClient(ClientProtocol):
+    def __init__(self, name, host=HOST, port=PORT, codec="json", reconnect=True):
+        super().__init__(name, codec)
+        self.server = (host, port)
+        self.auto_reconnect = reconnect
+        self.sock = None
+        self.send_lock = threading.Lock()
+        self.handlers = {}
+        self.listener = None
+
+    def on(self, mtype, fn):
+        """Call fn(data) on the listener thread for every mtype message.
+
+        "message" handlers get each whole message, "reconnecting" fires when
+        the connection drops and "disconnected" once the client gives up.
+        """
+        self.handlers.setdefault(mtype, []).append(fn)
+        return fn
+
+    def emit(self, mtype, arg):
+        for fn in self.handlers.get(mtype, ()):
+            fn(arg)
+
+    def connect(self):
+        """Open the connection, send join and start the listener thread."""
+        self.open_session()
+        self.listener = threading.Thread(target=self.listen_loop, daemon=True)
+        self.listener.start()
+
+    def open_session(self):
+        if self.sock:  # a reconnect: release the dropped socket first
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+        sock = socket.create_connection(self.server)
+        self.sock = sock
+        self.new_framer(sock)
+        self.send(self.join_message())
+
+    def send(self, obj):
+        with self.send_lock:
+            self.sock.sendall(self.codec.encode(obj))
+
+    def send_move(self, move):
+        self.send({"type": "move", "data": {"move": move}})
+
+    def quit(self):
+        self.quitting = True
+        try:
+            if self.sock:
+                self.send({"type": "quit"})
+                self.sock.close()
+        except OSError:
+            pass
+
+    def recv(self):
+        """Next message from the server, or None once the connection is gone."""
+        try:
+            frame = self.framer.read_frame()
+        except (FrameTooLarge, OSError):
+            return None
+        if frame is None:
+            return None
+        try:
+            return self.codec.decode(frame)
+        except ValueError:
+            return None
+
+    def reconnect(self):
+        """Retry until the server's grace window runs out; True once rejoined."""
+        if not (self.auto_reconnect and self.resume_token):
+            return False
+        self.emit("reconnecting", None)
+        deadline = time.monotonic() + self.resume_grace
+        delay = RECONNECT_DELAY
+        while not self.quitting and time.monotonic() < deadline:
+            time.sleep(delay)
+            try:
+                self.open_session()
+                return True
+            except OSError:
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        return False
+
+    def listen_loop(self):
+        try:
+            while True:
+                msg = self.recv()
+                if msg is None:
+                    if self.quitting or not self.reconnect():
+                        break
+                    continue
+                self.dispatch(msg)
+        finally:
+            self.emit("disconnected", None)
+
+    def dispatch(self, msg):
+        reply = self.absorb(msg)
+        if reply:
+            try:
+                self.send(reply)
+            except OSError:
+                pass  # the listener notices the dead socket and reconnects
+        self.emit("message", msg)
+        self.emit(msg.get("type"), msg.get("data") or {})
+
+# asyncio client --------------------------------------------------
+class AsyncRpsClient(ClientProtocol):
+    """async with AsyncRpsClient(...) as client: async for msg in client: ..."""
+    def __init__(self, name, host=HOST, port=PORT, codec="json", reconnect=True):
+        super().__init__(name, codec)
+        self.server = (host, port)
+        self.auto_reconnect = reconnect
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(*self.server)
+        self.new_framer()
+        self.send(self.join_message())
+
+    def send(self, obj):
+        self.writer.write(self.codec.encode(obj))
+
+    def send_move(self, move):
+        self.send({"type": "move", "data": {"move": move}})
+
+    async def quit(self):
+        self.quitting = True
+        try:
+            self.send({"type": "quit"})
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.writer.close()
+
+    async def read_message(self):
+        try:
+            while not self.framer.pending:
+                data = await self.reader.read(CHUNK_SIZE)
+                if not data:
+                    return None
+                self.framer.feed(data)
+            return self.codec.decode(self.framer.pop())
+        except (ConnectionError, ValueError):  # FrameTooLarge is a ValueError
+            return None
+
+    async def recv(self):
+        """Next message with pings answered and state updated; None once closed."""
+        while True:
+            msg = await self.read_message()
+            if msg is not None:
+                reply = self.absorb(msg)
+                if reply:
+                    self.send(reply)
+                return msg
+            if self.quitting or not await self.reconnect():
+                return None
+
+    async def reconnect(self):
+        if not (self.auto_reconnect and self.resume_token):
+            return False
+        self.writer.close()
+        deadline = time.monotonic() + self.resume_grace
+        delay = RECONNECT_DELAY
+        while not self.quitting and time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            try:
+                await self.connect()
+                return True
+            except OSError:
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        msg = await self.recv()
+        if msg is None:
+            raise StopAsyncIteration
+        return msg
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        if not self.quitting:
+            await self.quit()
+
+# Terminal front end ----------------------------------------------
+def describe(client, msg):
+    """One line of terminal output for a server message, or None to stay quiet."""
+    t, data = msg.get("type"), msg.get("data") or {}
+    if t == "join_ack":
+        return "Reconnected" if data.get("resumed") else "Joined server. Waiting for players..."
+    if t == "players" and client.opponent:
+        return f"Playing against {client.opponent}"
+    if t == "start_round":
+        return data.get("message", "Your move") + " [r]ock [p]aper [s]cissors [q]uit"
+    if t == "round_result":
+        you, opp = (data["p1"], data["p2"]) if data["p1"]["name"] == client.name else (data["p2"], data["p1"])
+        return (f"{client.outcome(data).upper()}: you {(you['move'] or '-')} vs {(opp['move'] or '-')}, "
+                f"score {you['score']}-{opp['score']}")
+    if t in ("opponent_left", "opponent_resumed", "error"):
+        return data.get("message", t)
+    if t == "opponent_reconnecting":
+        return f"Opponent lost connection, waiting up to {data.get('grace', 0):.0f}s"
+    return None
+
+def play_terminal(client):
+    """Moves from stdin; one letter or the full name per line."""
+    def show(msg):
+        line = describe(client, msg)
+        if line:
+            print(line)
+
+    done = threading.Event()
+    client.on("message", show)
+    client.on("reconnecting", lambda _: print("Connection lost. Reconnecting..."))
+    client.on("disconnected", lambda _: (print("Disconnected"), done.set()))
+    client.connect()
+    moves = {**{m[0]: m for m in MOVES}, **{m: m for m in MOVES}}
+    for line in sys.stdin:
+        word = line.strip().lower()
+        if word in ("q", "quit") or done.is_set():
+            break
+        move = moves.get(word)
+        if move is None:
+            print("Enter r, p, s or q")
+        elif not client.in_round:
+            print("Wait for the next round")
+        else:
+            client.send_move(move)
+    client.quit()
+
+async def play_bot(client, strategy, rounds):
+    async with client:
+        async for msg in client:
+            line = describe(client, msg)
+            if line:
+                print(line)
+            if msg.get("type") == "start_round":
+                client.send_move(strategy(client))
+            elif client.rounds >= rounds:
+                break
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Terminal Rock-Paper-Scissors client")
+    parser.add_argument("--name", default=f"cli{random.randrange(10000)}")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--codec", choices=sorted(CODECS), default="json", help="wire format to ask for")
+    parser.add_argument("--bot", choices=sorted(STRATEGIES), help="play automatically with this strategy")
+    parser.add_argument("--rounds", type=int, default=10, help="rounds a bot plays before quitting")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.bot:
+            asyncio.run(play_bot(AsyncRpsClient(args.name, args.host, args.port, args.codec),
+                                 STRATEGIES[args.bot], args.rounds))
+        else:
+            play_terminal(RpsClient(args.name, args.host, args.port, args.codec))
+    except OSError as e:
+        sys.exit(f"Connection failed: {e}")
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
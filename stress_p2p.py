@@ -0,0 +1,133 @@
+import argparse, importlib.util, json, os, random, socket, sys, threading, time
+
+from framing import LineFramer, encode_json
+from outcomes import MOVES
+
+# Peer-to-peer framing stress --------------------------------------------------
+# python stress_p2p.py [-n 100000] [--batch 64] [--script "Rock_Paper_Scissors Game_6.py"]
+# Replays the RPSGameGUI peer link over a real localhost socket: one side
+# sends move messages back to back, --batch of them per write, with each
+# write cut at random byte offsets; the other side runs the GUI's own
+# handle_messages/recv_message, loaded from the game script, on a stand-in
+# for the window (the script's imports are needed, a display is not).
+# Every message has to arrive exactly once, in order, and reach
+# process_round as the right move. The old recv(1024) + json.loads reader
+# runs over the same traffic for comparison. Exits 1 if the GUI reader
+# loses, reorders or misroutes anything.
+
+GUI_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Rock_Paper_Scissors Game_7.py")
+
+def load_gui(path):
+    """The RPSGameGUI class defined in a game script."""
+    spec = importlib.util.spec_from_file_location("rps_game_gui", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.RPSGameGUI
+
+class GuiPeer:
+    """Just enough of an RPSGameGUI for its reader thread to run without Tk."""
+    def __init__(self, gui, sock):
+        self.gui = gui
+        self.framer = LineFramer(sock)
+        self.root = self  # handle_messages schedules through root.after
+        self.opponent_move = None
+        self.seqs = []
+        self.moves = []  # opponent_move each time process_round ran
+        self.errors = 0
+
+    def recv_message(self):
+        try:
+            msg = self.gui.recv_message(self)
+        except ValueError:
+            self.errors += 1
+            raise
+        if msg is not None:
+            self.seqs.append(msg["data"]["seq"])
+        return msg
+
+    def after(self, ms, fn):
+        fn()
+
+    def process_round(self):
+        self.moves.append(self.opponent_move)
+
+def send_stream(sock, messages, batch, seed):
+    rng = random.Random(seed)
+    buf = bytearray()
+    for i in range(messages):
+        buf += encode_json({"type": "move", "data": {"move": MOVES[i % len(MOVES)], "seq": i}})
+        if (i + 1) % batch and i != messages - 1:
+            continue
+        view, pos = memoryview(buf), 0
+        while pos < len(buf):
+            n = rng.randint(1, 2 * len(buf) // batch + 1)
+            sock.sendall(view[pos:pos + n])
+            pos += n
+        view.release()
+        buf.clear()
+    sock.shutdown(socket.SHUT_WR)
+
+def gui_reader(gui):
+    def read_gui(sock):
+        peer = GuiPeer(gui, sock)
+        gui.handle_messages(peer)
+        misrouted = sum(move != MOVES[seq % len(MOVES)] for seq, move in zip(peer.seqs, peer.moves))
+        misrouted += abs(len(peer.seqs) - len(peer.moves))
+        return peer.seqs, peer.errors + misrouted
+    return read_gui
+
+def read_legacy(sock):
+    # The reader RPSGameGUI had: one recv, one json.loads
+    seqs, errors = [], 0
+    while True:
+        data = sock.recv(1024)
+        if not data:
+            break
+        try:
+            seqs.append(json.loads(data.decode("utf-8"))["data"]["seq"])
+        except (ValueError, KeyError, TypeError):  # UnicodeDecodeError is a ValueError
+            errors += 1
+    return seqs, errors
+
+def run(reader, messages, batch, seed):
+    listener = socket.create_server(("127.0.0.1", 0))
+    sender = socket.create_connection(listener.getsockname())
+    receiver, _ = listener.accept()
+    listener.close()
+    thread = threading.Thread(target=send_stream, args=(sender, messages, batch, seed), daemon=True)
+    t0 = time.perf_counter()
+    thread.start()
+    seqs, errors = reader(receiver)
+    elapsed = time.perf_counter() - t0
+    thread.join()
+    sender.close()
+    receiver.close()
+    return {
+        "received": len(seqs),
+        "errors": errors,
+        "in_order": seqs == list(range(messages)),
+        "msgs_per_s": round(len(seqs) / elapsed, 1) if elapsed else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Back-to-back message stress for the P2P link framing")
+    parser.add_argument("-n", "--messages", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=64, help="messages per write before random splitting")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--script", default=GUI_SCRIPT, help="game script whose RPSGameGUI reader to drive")
+    args = parser.parse_args(argv)
+
+    try:
+        gui = load_gui(args.script)
+    except (ImportError, OSError, AttributeError) as e:
+        sys.exit(f"Could not load RPSGameGUI from {args.script}: {e}")
+    print(f"{args.messages} messages, {args.batch} per write, split at random offsets")
+    print(f"{'reader':<10} {'received':>9} {'errors':>7} {'in order':>9} {'msgs/s':>11}")
+    results = {}
+    for name, reader in (("legacy", read_legacy), ("gui", gui_reader(gui))):
+        r = results[name] = run(reader, args.messages, args.batch, args.seed)
+        print(f"{name:<10} {r['received']:>9} {r['errors']:>7} {str(r['in_order']):>9} {r['msgs_per_s']:>11}")
+    sys.exit(0 if results["gui"]["in_order"] and not results["gui"]["errors"] else 1)
+
+if __name__ == "__main__":
+    main()
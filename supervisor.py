@@ -0,0 +1,154 @@
+import multiprocessing, signal, time, os, argparse
+
+from control import ControlServer, query
+
+# Multi-process sharding ------------------------------------------------------
+# N workers bind the same port with SO_REUSEPORT, so the kernel spreads new
+# connections across them and each runs its own matches on its own core.
+# The supervisor restarts workers that die and answers "stats" on its
+# control socket by summing what every worker reports.
+
+CHECK_INTERVAL = 0.5
+SUMMED = ("players", "matches", "waiting", "rounds")
+
+def run_worker(args, index, control_path):
+    from gameserver import make_server
+    from profiling import PROFILER
+    # Replace the supervisor's handler: SIGTERM now unwinds like Ctrl+C, so the
+    # server's shutdown() flushes history and recordings before the worker exits
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    PROFILER.install_signals(f"[WORKER {index}]")
+    print(f"[WORKER {index}] starting")
+    args = argparse.Namespace(**vars(args))
+    if args.metrics_port is not None:
+        args.metrics_port += index
+    if args.history:
+        args.history = f"{args.history}.w{index}"  # one log per worker, no cross-process writes
+    if args.record:
+        args.record = f"{args.record}.w{index}"
+    make_server(args, reuse_port=True, control_path=control_path).start()
+
+class Supervisor:
+    def __init__(self, args):
+        self.args = args
+        self.control_path = args.control or f"/tmp/rps-{args.port}.ctl"
+        self.workers = [None] * args.workers
+        self.restarts = [0] * args.workers
+        self.control = None
+        self.running = True
+
+    def worker_path(self, index):
+        return f"{self.control_path}.w{index}"
+
+    def spawn(self, index):
+        proc = multiprocessing.Process(target=run_worker, name=f"rps-worker-{index}",
+                                       args=(self.args, index, self.worker_path(index)))
+        proc.start()
+        self.workers[index] = proc
+
+    def run(self):
+        self.control = ControlServer(self.control_path, {"stats": self.stats, "profile": self.profile,
+                                                         "history": self.history,
+                                                         "leaderboard": self.leaderboard})
+        self.control.start()
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        for i in range(len(self.workers)):
+            self.spawn(i)
+        print(f"[SUPERVISOR] {len(self.workers)} workers, control socket {self.control_path}")
+        try:
+            while self.running:
+                time.sleep(CHECK_INTERVAL)
+                for i, proc in enumerate(self.workers):
+                    if self.running and not proc.is_alive():
+                        print(f"[SUPERVISOR] Worker {i} (pid {proc.pid}) exited with {proc.exitcode}, restarting")
+                        self.restarts[i] += 1
+                        self.spawn(i)
+        except KeyboardInterrupt:
+            print("\n[SUPERVISOR] Shutting down...")
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        self.running = False
+
+    def shutdown(self):
+        self.running = False
+        for proc in self.workers:
+            if proc and proc.is_alive():
+                proc.terminate()
+        for i, proc in enumerate(self.workers):
+            if proc:
+                proc.join(5)
+            try:
+                os.unlink(self.worker_path(i))
+            except OSError:
+                pass
+        self.control.stop()
+
+    def profile(self, action="dump"):
+        """Forward a profile command to every worker."""
+        replies = []
+        for i in range(len(self.workers)):
+            try:
+                replies.append(query(self.worker_path(i), f"profile {action}"))
+            except OSError as e:
+                replies.append({"error": str(e)})
+        return {"workers": replies}
+
+    def history(self, kind="", key=""):
+        """Forward a history lookup to every worker and merge the records."""
+        records, errors = [], []
+        for i in range(len(self.workers)):
+            try:
+                reply = query(self.worker_path(i), f"history {kind} {key}")
+            except OSError as e:
+                errors.append({"worker": i, "error": str(e)})
+                continue
+            if "error" in reply:
+                errors.append({"worker": i, "error": reply["error"]})
+            for record in reply.get("records", []):
+                record["worker"] = i
+                records.append(record)
+        records.sort(key=lambda r: r["time"])
+        return {"records": records, "errors": errors} if errors else {"records": records}
+
+    def leaderboard(self, action="top", *args):
+        """Merge the workers' top lists; rank and around answer per worker.
+
+        Ratings are kept per worker, so a player matched on several workers
+        has one rating on each; the merged list shows their best one and
+        the worker it came from, and "players" counts them once per worker.
+        """
+        replies = []
+        for i in range(len(self.workers)):
+            try:
+                replies.append(query(self.worker_path(i), " ".join(("leaderboard", action) + args)))
+            except OSError as e:
+                replies.append({"error": str(e)})
+        if action != "top":
+            return {"workers": replies}
+        k = int(args[0]) if args and args[0].isdigit() else 10
+        best = {}
+        for i, reply in enumerate(replies):
+            for row in reply.get("top", []):
+                row["worker"] = i
+                if row["name"] not in best or row["rating"] > best[row["name"]]["rating"]:
+                    best[row["name"]] = row
+        rows = sorted(best.values(), key=lambda row: (-row["rating"], row["name"]))[:k]
+        for rank, row in enumerate(rows, 1):
+            row["rank"] = rank
+        return {"players": sum(r.get("players", 0) for r in replies), "top": rows}
+
+    def stats(self):
+        total = {key: 0 for key in SUMMED}
+        total["workers"] = []
+        for i, proc in enumerate(self.workers):
+            try:
+                worker = query(self.worker_path(i), "stats")
+            except OSError as e:
+                worker = {"error": str(e)}
+            for key in SUMMED:
+                total[key] += worker.get(key, 0)
+            worker.update(worker=i, pid=proc.pid if proc else None, restarts=self.restarts[i])
+            total["workers"].append(worker)
+        return total
@@ -0,0 +1,100 @@
+import threading, time, math
+
+# Hashed timer wheel ------------------------------------------------------
+# One thread services every pending timer of the threaded engine (round
+# delays, move deadlines, lobby sweeps). Scheduling and cancelling are O(1);
+# each tick only looks at the timers hashed into the current slot.
+
+TICK = 0.05
+SLOTS = 512
+
+class Timer:
+    __slots__ = ("target", "fn", "cancelled", "wheel")
+
+    def __init__(self, target, fn, wheel):
+        self.target = target
+        self.fn = fn
+        self.cancelled = False
+        self.wheel = wheel
+
+    def cancel(self):
+        wheel = self.wheel
+        if wheel is not None:
+            wheel._cancel(self)
+        self.cancelled = True
+
+class TimerWheel:
+    def __init__(self, tick=TICK, slots=SLOTS, clock=time.monotonic):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.clock = clock
+        self.origin = clock()
+        self.current = 0  # last tick processed
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def __len__(self):
+        return self.pending
+
+    def call_later(self, delay, fn):
+        """Run fn on the wheel thread after delay seconds; returns a Timer."""
+        with self.lock:
+            # Round up so a timer never fires early, and never in the past
+            elapsed = (self.clock() - self.origin) / self.tick
+            target = max(self.current + 1, math.ceil(elapsed + delay / self.tick))
+            timer = Timer(target, fn, self)
+            self.slots[target % len(self.slots)].append(timer)
+            self.pending += 1
+        return timer
+
+    def _cancel(self, timer):
+        with self.lock:
+            if timer.wheel is not None:  # still counted as pending
+                timer.wheel = None
+                self.pending -= 1
+            timer.cancelled = True
+
+    def advance(self):
+        """Fire every timer that is due; returns how many ran."""
+        now = int((self.clock() - self.origin) / self.tick)
+        due = []
+        with self.lock:
+            while self.current < now:
+                self.current += 1
+                slot = self.slots[self.current % len(self.slots)]
+                if not slot:
+                    continue
+                keep = []
+                for timer in slot:
+                    if timer.cancelled:
+                        continue
+                    if timer.target <= self.current:
+                        timer.wheel = None
+                        due.append(timer)
+                    else:
+                        keep.append(timer)  # due on a later revolution
+                slot[:] = keep
+            self.pending -= len(due)
+        for timer in due:
+            if timer.cancelled:
+                continue
+            try:
+                timer.fn()
+            except Exception as e:
+                print(f"[TIMER] {timer.fn!r} failed: {e}")
+        return len(due)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while self.running:
+            time.sleep(self.tick)
+            self.advance()
+
+    def stop(self):
+        self.running = False